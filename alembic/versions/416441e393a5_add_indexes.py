@@ -0,0 +1,74 @@
+"""add indexes
+
+Revision ID: 416441e393a5
+Revises: 5ecce3388348
+Create Date: 2026-10-18 09:00:00.000000
+
+B-tree індекси на зовнішні ключі та поля фільтрів, а також унікальний
+частковий індекс uq_sessions_open_vehicle: не більше однієї відкритої сесії
+(updated_at IS NULL) на машину. Якщо в базі є машини з кількома відкритими
+сесіями, міграція зупиняється і виводить їх: закриття такої сесії змінює
+суму до сплати, тому їх треба закрити (чи видалити) вручну і повторити
+міграцію.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '416441e393a5'
+down_revision: Union[str, None] = '5ecce3388348'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SURPLUS_OPEN_SESSIONS = """
+    SELECT id, vehicle_id, created_at FROM sessions
+    WHERE updated_at IS NULL AND vehicle_id IN (
+        SELECT vehicle_id FROM sessions WHERE updated_at IS NULL
+        GROUP BY vehicle_id HAVING count(*) > 1
+    )
+    ORDER BY vehicle_id, id
+"""
+
+INDEXES = [
+    ('ix_sessions_vehicle_id', 'sessions', ['vehicle_id']),
+    ('ix_sessions_updated_at', 'sessions', ['updated_at']),
+    ('ix_payments_session_id', 'payments', ['session_id']),
+    ('ix_payments_vehicle_id', 'payments', ['vehicle_id']),
+    ('ix_blacklists_vehicle_id', 'blacklists', ['vehicle_id']),
+    ('ix_vehicles_owner_id', 'vehicles', ['owner_id']),
+    ('ix_vehicles_ended_at', 'vehicles', ['ended_at']),
+]
+
+
+def upgrade() -> None:
+    rows = op.get_bind().execute(sa.text(SURPLUS_OPEN_SESSIONS)).all()
+    if rows:
+        listing = "\n".join(
+            f"  session {row.id}, vehicle {row.vehicle_id}, opened {row.created_at}"
+            for row in rows
+        )
+        raise RuntimeError(
+            "Vehicles with more than one open session (updated_at IS NULL); "
+            "close or delete the surplus sessions by hand and run the migration again:\n"
+            + listing
+        )
+
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+    op.create_index(
+        'uq_sessions_open_vehicle',
+        'sessions',
+        ['vehicle_id'],
+        unique=True,
+        postgresql_where=sa.text('updated_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_sessions_open_vehicle', table_name='sessions')
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
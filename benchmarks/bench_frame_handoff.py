@@ -0,0 +1,118 @@
+"""
+Передача кадрів процесу-воркеру: байти через pickle (як було) проти кільця
+кадрів у спільній пам'яті (FrameRing), коли між процесами йде лише FrameRef.
+
+Кадри 1080p та 4K: JPEG (те, що надсилає камера чи клієнт) та сирий BGR.
+Звітує затримку одного виклику в пулі з одним воркером: лише передача
+(воркер читає кадр) та передача з декодуванням для каскаду (JPEG).
+Перед вимірюванням перевіряє, що воркер отримує ті самі байти (crc32).
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_frame_handoff.py
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from statistics import mean, median
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from src.services.frame_ring import FrameRef, FrameRing, frame_view  # noqa: E402
+
+SOURCE_IMAGE = Path("DS/images/AA1080BC.jpg")
+RESOLUTIONS = {"1080p": (1920, 1080), "4K": (3840, 2160)}
+REPEAT = 50
+
+
+def _photo(frame):
+    return frame_view(frame) if isinstance(frame, FrameRef) else frame
+
+
+def checksum(frame):
+    return zlib.crc32(_photo(frame))
+
+
+def touch(frame):
+    """воркер лише читає кадр (кожна сторінка пам'яті)"""
+    return int(np.frombuffer(_photo(frame), np.uint8)[::4096].sum())
+
+
+def decode(frame):
+    """воркер декодує JPEG зменшеним сірим, як для каскаду"""
+    gray = cv2.imdecode(np.frombuffer(_photo(frame), np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    return gray.shape
+
+
+def payloads():
+    source = cv2.imread(str(SOURCE_IMAGE))
+    for name, size in RESOLUTIONS.items():
+        frame = cv2.resize(source, size, interpolation=cv2.INTER_CUBIC)
+        _, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
+        yield f"{name} jpeg", jpeg.tobytes(), True
+        yield f"{name} raw", frame.tobytes(), False
+
+
+def timed(pool, func, frame_for, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        frame, release = frame_for()
+        pool.submit(func, frame).result()
+        release()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    cases = list(payloads())
+    ring = FrameRing(slots=4, slot_size=max(len(data) for _, data, _ in cases))
+    ring.open()
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        pool.submit(touch, b"warm up").result()
+
+        print(f"{'frame':<12} {'size':>9} {'task':<7} {'pickle ms':>10} {'shm ms':>8} {'speedup':>8}")
+        for name, data, is_jpeg in cases:
+            def by_pickle():
+                return data, lambda: None
+
+            def by_ring():
+                ref = ring.put(data)
+                return ref, lambda: ring.release(ref)
+
+            ref = ring.put(data)
+            same = pool.submit(checksum, ref).result() == zlib.crc32(data)
+            ring.release(ref)
+            if not same:
+                sys.exit(f"{name}: frame in shared memory differs")
+
+            for task in (touch, decode) if is_jpeg else (touch,):
+                before = timed(pool, task, by_pickle, args.repeat)
+                after = timed(pool, task, by_ring, args.repeat)
+                print(
+                    f"{name:<12} {len(data) / 2**20:>7.2f}MB {task.__name__:<7} "
+                    f"{median(before):>10.3f} {median(after):>8.3f} "
+                    f"{'x%.1f' % (mean(before) / mean(after)):>8}"
+                )
+        print("median per call, speedup by mean; frames verified by crc32")
+    finally:
+        pool.shutdown()
+        ring.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Відстань Геммінга між dHash кадрів (plate_tracker.dhash) на DS/images:
+повторні кадри тієї ж машини проти кадрів різних машин - на чому
+тримається поріг GATE_REPEAT_HASH_DISTANCE.
+
+Повторні кадри імітуються з кожного зображення: перекодування JPEG з
+іншою якістю, зміна яскравості, шум сенсора та зсув кадру на кілька
+пікселів. Окремо звітуються різні знімки тієї ж машини (AA6418XA та
+AA6418XA_2 тощо) та всі пари різних машин. Для кожного порогу - частка
+впізнаних повторів і частка хибних збігів між різними машинами.
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_gate_hash.py
+"""
+import argparse
+import os
+import sys
+from itertools import combinations
+from pathlib import Path
+from statistics import median
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from src.services.plate_tracker import dhash  # noqa: E402
+
+IMAGES_DIR = Path("DS/images")
+THRESHOLDS = (2, 4, 6, 8, 10, 12)
+
+
+def label(path: Path) -> str:
+    """номер з назви файлу: AE1455KH_f.jpg -> AE1455KH"""
+    return path.stem.split("_")[0]
+
+
+def encode(img, quality=95) -> bytes:
+    return cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def shifted(img, dx, dy):
+    """зсув кадру на (dx, dy) пікселів з обрізанням країв, розмір той самий"""
+    h, w = img.shape[:2]
+    crop = img[max(dy, 0) : h + min(dy, 0), max(dx, 0) : w + min(dx, 0)]
+    return cv2.resize(crop, (w, h), interpolation=cv2.INTER_LINEAR)
+
+
+def repeats(img, rng):
+    """кадри, які камера надсилає для тієї ж машини, що стоїть перед шлагбаумом"""
+    noise = rng.normal(0, 6, img.shape)
+    return {
+        "jpeg q60": encode(img, 60),
+        "brightness +20": encode(cv2.convertScaleAbs(img, alpha=1.0, beta=20)),
+        "contrast 0.85": encode(cv2.convertScaleAbs(img, alpha=0.85, beta=0)),
+        "sensor noise": encode(np.clip(img + noise, 0, 255).astype(np.uint8)),
+        "shift 1%": encode(shifted(img, img.shape[1] // 100, img.shape[0] // 100)),
+        "shift 3%": encode(shifted(img, img.shape[1] * 3 // 100, img.shape[0] * 3 // 100)),
+    }
+
+
+def distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def summary(name, distances):
+    return (
+        f"{name:<22} {len(distances):>6} {min(distances):>5} {median(distances):>7.1f} "
+        f"{max(distances):>5}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=Path, default=IMAGES_DIR)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    paths = sorted(args.images.glob("*.jpg"))
+    originals = {path: path.read_bytes() for path in paths}
+    hashes = {path: dhash(photo) for path, photo in originals.items()}
+
+    by_kind: dict[str, list[int]] = {}
+    for path, photo in originals.items():
+        img = cv2.imdecode(np.frombuffer(photo, np.uint8), cv2.IMREAD_COLOR)
+        for kind, frame in repeats(img, rng).items():
+            by_kind.setdefault(kind, []).append(distance(hashes[path], dhash(frame)))
+    same_frame = [d for distances in by_kind.values() for d in distances]
+
+    same_car, other_car = [], []
+    for a, b in combinations(paths, 2):
+        (same_car if label(a) == label(b) else other_car).append(distance(hashes[a], hashes[b]))
+
+    print(f"{len(paths)} images, distances in bits of {dhash.__module__}.dhash (64 bits)")
+    print(f"{'pairs':<22} {'count':>6} {'min':>5} {'median':>7} {'max':>5}")
+    for kind, distances in by_kind.items():
+        print(summary(f"repeat: {kind}", distances))
+    print(summary("repeat: all", same_frame))
+    if same_car:
+        print(summary("same car, other photo", same_car))
+    if other_car:
+        print(summary("different cars", other_car))
+
+    print()
+    print(f"{'threshold':>9} {'repeats matched':>16} {'different cars matched':>23}")
+    for threshold in THRESHOLDS:
+        matched = sum(d <= threshold for d in same_frame) / len(same_frame)
+        false = sum(d <= threshold for d in other_car) / max(len(other_car), 1)
+        print(f"{threshold:>9} {matched:>16.1%} {false:>23.2%}")
+
+
+if __name__ == "__main__":
+    main()
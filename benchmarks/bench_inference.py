@@ -0,0 +1,123 @@
+"""
+Порівняння бекендів класифікатора символів (keras, onnx, tflite) на DS/images:
+затримка класифікації одного номера, час завантаження моделі, пікова пам'ять
+процесу та збіг передбачень з Keras.
+
+Кожен бекенд запускається в окремому процесі, щоб пам'ять не змішувалась.
+ONNX та TFLite моделі створюються скриптом scripts/export_model.py.
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_inference.py
+    python benchmarks/bench_inference.py --backends keras onnx
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from statistics import mean, quantiles
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)  # шляхи до моделей у use_model відносні до кореня проєкту
+
+from src.services import use_model  # noqa: E402
+from src.services.inference import BACKENDS, load_backend, MODEL_PATHS  # noqa: E402
+
+IMAGES_DIR = Path("DS/images")
+REPEAT = 10
+ATOL = 1e-4
+
+
+def plate_batches():
+    batches = []
+    for path in sorted(IMAGES_DIR.glob("*.jpg")):
+        img = cv2.imread(str(path))
+        try:
+            _, plate, _ = use_model.detect_plate(img, draw=False)
+        except UnboundLocalError:
+            continue
+        chars = use_model.segment_characters(plate, echo=False)
+        if len(chars):
+            batches.append((path.stem, use_model.prepare_characters(chars).copy()))
+    return batches
+
+
+def run_backend(name: str) -> dict:
+    batches = plate_batches()
+
+    started = time.perf_counter()
+    backend = load_backend(name)
+    load_s = time.perf_counter() - started
+
+    backend.predict(batches[0][1])  # прогрів
+    timings, probabilities = [], {}
+    for stem, batch in batches:
+        for _ in range(REPEAT):
+            started = time.perf_counter()
+            y_proba = backend.predict(batch)
+            timings.append((time.perf_counter() - started) * 1000)
+        probabilities[stem] = np.asarray(y_proba, dtype=np.float32).tolist()
+
+    return {
+        "backend": name,
+        "load_s": load_s,
+        "mean_ms": mean(timings),
+        "p95_ms": quantiles(timings, n=20)[-1],
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "probabilities": probabilities,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child)))
+        return
+
+    results = {}
+    for name in args.backends:
+        if not (ROOT / MODEL_PATHS[name]).exists():
+            print(f"{name:<8} skipped: {MODEL_PATHS[name]} not found")
+            continue
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", name],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])
+
+    reference = results.get("keras")
+    for name, result in results.items():
+        line = (
+            f"{name:<8} load {result['load_s']:6.2f} s   "
+            f"mean {result['mean_ms']:7.2f} ms   p95 {result['p95_ms']:7.2f} ms   "
+            f"peak RSS {result['rss_mb']:8.1f} MB"
+        )
+        if reference is not None and name != "keras":
+            same, max_diff = 0, 0.0
+            for stem, proba in result["probabilities"].items():
+                expected = np.array(reference["probabilities"][stem])
+                proba = np.array(proba)
+                same += np.array_equal(expected.argmax(axis=1), proba.argmax(axis=1))
+                max_diff = max(max_diff, float(np.abs(expected - proba).max()))
+            total = len(result["probabilities"])
+            line += f"   same as keras {same}/{total}, max |diff| {max_diff:.2e}"
+            assert same == total, f"{name}: predictions differ from keras"
+            assert max_diff < ATOL, f"{name}: probabilities differ from keras"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
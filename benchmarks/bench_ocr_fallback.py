@@ -0,0 +1,70 @@
+"""
+OCR-резерв: повнокадровий OCR (як було) проти OCR області номерного знака
+зі зменшеним повним кадром лише в останню чергу.
+
+Звітує затримку та точність (точний збіг з номером з назви файлу) на DS/images.
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_ocr_fallback.py
+"""
+import os
+import sys
+import time
+from pathlib import Path
+from statistics import mean, median
+
+import cv2
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)  # шляхи до моделей у use_model відносні до кореня проєкту
+
+from src.services import use_model  # noqa: E402
+
+IMAGES_DIR = Path("DS/images")
+
+
+def label(path: Path) -> str:
+    """номер з назви файлу: AE1455KH_f.jpg -> AE1455KH"""
+    return path.stem.split("_")[0]
+
+
+def full_frame(img, plate_rect):
+    return use_model.extract_license_plate_text(img)[0]
+
+
+def plate_region(img, plate_rect):
+    return use_model.ocr_fallback(img, plate_rect)[0]
+
+
+def run(strategy, images):
+    timings, correct = [], 0
+    for path, img, plate_rect in images:
+        started = time.perf_counter()
+        number = strategy(img, plate_rect)
+        timings.append((time.perf_counter() - started) * 1000)
+        correct += use_model.normalize_number(number) == label(path)
+    return timings, correct
+
+
+def main():
+    images = []
+    for path in sorted(IMAGES_DIR.glob("*.jpg")):
+        img = cv2.imread(str(path))
+        rect = use_model.find_plate_rect(img)
+        images.append((path, img, [rect] if rect is not None else []))
+
+    use_model.recognizer.warm_up()
+    with_roi = sum(1 for _, _, rect in images if rect)
+    print(f"images: {len(images)}, with cascade ROI: {with_roi}")
+
+    for name, strategy in (("full frame", full_frame), ("plate ROI", plate_region)):
+        timings, correct = run(strategy, images)
+        print(
+            f"{name:<12} mean {mean(timings):8.1f} ms   median {median(timings):8.1f} ms"
+            f"   max {max(timings):8.1f} ms   accuracy {correct}/{len(images)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
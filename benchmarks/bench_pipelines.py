@@ -0,0 +1,459 @@
+"""
+Регресійний бенчмарк конвеєрів розпізнавання на розмічених фото DS/images
+(номер - у назві файлу: AE1455KH_f.jpg -> AE1455KH).
+
+Для кожного конвеєра звітує:
+- затримку p50/p95/p99 по етапах (decode, cascade, segment, classify, ocr)
+  та для всього зображення (total);
+- пропускну здатність (зображень/с) з 1..N процесами-воркерами;
+- пікову пам'ять процесу (RSS) та воркерів;
+- точність (точний збіг з номером з назви файлу).
+
+Результати записуються в JSON, тож прогони можна порівнювати між собою
+(--baseline попередній.json).
+
+Конвеєри:
+    service             src/services/use_model.py (PlateRecognizer)
+    ds_use_model        DS/main/use_model.py
+    ds_use_model_2      DS/main/use_model_2.py
+    ds_use_model_old    DS/main/use_model_old.py
+    ds_async            DS/main/image_process_async.py
+
+Прототипи з DS виконують розпізнавання прямо при імпорті, тож з їх файлів
+беруться лише імпорти, функції та константи, а каскад і модель підставляються
+бенчмарком (з DS/models).
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_pipelines.py
+    python benchmarks/bench_pipelines.py --pipelines service ds_use_model --workers 4
+    python benchmarks/bench_pipelines.py --baseline benchmarks/results/pipelines-....json
+"""
+import argparse
+import ast
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(1, str(ROOT / "DS/main"))  # from constants import IMAGES у прототипах
+os.chdir(ROOT)  # шляхи до моделей відносні до кореня проєкту
+os.environ.setdefault("MPLBACKEND", "Agg")
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+IMAGES_DIR = Path("DS/images")
+RESULTS_DIR = Path("benchmarks/results")
+DS_CASCADE = "DS/models/haarcascade_ua_license_plate.xml"
+DS_MODEL = "DS/models/model_ua_license_plate.keras"
+STAGES = ("decode", "cascade", "segment", "classify", "ocr", "total")
+PERCENTILES = (50, 95, 99)
+
+
+def label(path: Path) -> str:
+    """номер з назви файлу: AE1455KH_f.jpg -> AE1455KH"""
+    return path.stem.split("_")[0]
+
+
+def labelled_images() -> list[Path]:
+    return sorted(IMAGES_DIR.glob("*.jpg"))
+
+
+class StageTimer:
+    """час етапів одного зображення, мс"""
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def __call__(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+
+
+def load_definitions(path: str, **injected) -> dict:
+    """
+    Виконує з файлу прототипу лише імпорти, функції та константи (імена
+    ВЕЛИКИМИ літерами). Глобальні змінні, які функції очікують (plate_cascade,
+    model, tmp_file), передаються через injected.
+    """
+    tree = ast.parse(Path(path).read_text(encoding="utf-8"), filename=path)
+
+    def keep(node):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            return True
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            return True
+        if isinstance(node, ast.Assign):
+            return all(isinstance(t, ast.Name) and t.id.isupper() for t in node.targets)
+        return False
+
+    tree.body = [node for node in tree.body if keep(node)]
+    namespace = {"__name__": Path(path).stem, "__file__": path}
+    exec(compile(tree, path, "exec"), namespace)
+    namespace.update(injected)
+    return namespace
+
+
+class Pipeline:
+    name = ""
+
+    def load(self):
+        """завантаження моделей (не входить у вимірювання)"""
+
+    def run(self, path: Path, timer: StageTimer) -> str:
+        raise NotImplementedError
+
+
+class ServicePipeline(Pipeline):
+    """src/services/use_model.py: каскад на зменшеному кадрі, пакетна класифікація, OCR-резерв"""
+
+    name = "service"
+
+    def load(self):
+        from src.services import use_model
+
+        self.use_model = use_model
+        self.recognizer = use_model.PlateRecognizer(
+            cascade_path=str(ROOT / use_model.MODEL_CASCADE)
+        )
+        self.recognizer.warm_up()
+        self.timer = None
+
+        # OCR-резерв вимірюється лише тоді, коли він справді запускається
+        ocr_fallback = self.recognizer.ocr_fallback
+
+        def timed_ocr_fallback(*args):
+            with self.timer("ocr"):
+                return ocr_fallback(*args)
+
+        self.recognizer.ocr_fallback = timed_ocr_fallback
+
+    def run(self, path, timer):
+        self.timer = timer
+        use_model, recognizer = self.use_model, self.recognizer
+        photo = path.read_bytes()
+
+        with timer("decode"):
+            img = use_model.decode_photo(photo)
+            detection = use_model.decode_for_detection(photo, shape=img.shape)
+
+        with timer("cascade"):
+            try:
+                output_img, plate, plate_rect = recognizer.detect_plate(
+                    img, detection=detection, draw=False
+                )
+            except UnboundLocalError:
+                output_img, plate, plate_rect = img, None, []
+
+        number, probabilities = "NOT RECOGNIZED", None
+        if plate is not None:
+            with timer("segment"):
+                symbols = use_model.segment_characters(plate, echo=False)
+            with timer("classify"):
+                number, probabilities = recognizer.classify_numbers([symbols])[0]
+
+        number, _, _ = recognizer.finish_recognition(
+            number, probabilities, img, output_img, plate_rect, echo=False
+        )
+        return number
+
+
+class DSPipeline(Pipeline):
+    """прототип з DS/main: посимвольна класифікація, без OCR"""
+
+    source = ""
+    classify_name = "show_results"
+
+    def load(self):
+        import cv2
+        from keras.models import load_model
+
+        self.cv2 = cv2
+        self._tmp = tempfile.NamedTemporaryFile(suffix=".jpg", delete=False)
+        self.ns = load_definitions(
+            self.source,
+            plate_cascade=cv2.CascadeClassifier(str(ROOT / DS_CASCADE)),
+            model=load_model(str(ROOT / DS_MODEL), compile=False),
+            tmp_file=self._tmp.name,
+        )
+
+    def call(self, name, *args, **kwargs):
+        return self.ns[name](*args, **kwargs)
+
+    def run(self, path, timer):
+        with timer("decode"):
+            img = self.cv2.imread(str(path))
+
+        with timer("cascade"):
+            try:
+                plate = self.call("detect_plate", img)[1]
+            except (UnboundLocalError, IndexError):
+                plate = None
+        if plate is None:
+            return "NOT RECOGNIZED"
+
+        with timer("segment"):
+            chars = self.call("segment_characters", plate, echo=False)
+        with timer("classify"):
+            number = self.call(self.classify_name, chars)
+        return self.postprocess(number)
+
+    def postprocess(self, number):
+        return number
+
+
+class DSUseModel(DSPipeline):
+    name = "ds_use_model"
+    source = "DS/main/use_model.py"
+    classify_name = "prediction_number"
+
+    def postprocess(self, number):
+        if len(number) == 8:
+            number = self.call("correction_ua_number", number)
+        return number
+
+
+class DSUseModel2(DSPipeline):
+    name = "ds_use_model_2"
+    source = "DS/main/use_model_2.py"
+
+
+class DSUseModelOld(DSPipeline):
+    name = "ds_use_model_old"
+    source = "DS/main/use_model_old.py"
+
+
+class DSAsync(DSPipeline):
+    """DS/main/image_process_async.py: ті самі етапи, але корутинами"""
+
+    name = "ds_async"
+    source = "DS/main/image_process_async.py"
+
+    def load(self):
+        super().load()
+        self.loop = asyncio.new_event_loop()
+
+    def call(self, name, *args, **kwargs):
+        kwargs.pop("echo", None)
+        return self.loop.run_until_complete(self.ns[name](*args, **kwargs))
+
+
+PIPELINES = {
+    pipeline.name: pipeline
+    for pipeline in (ServicePipeline, DSUseModel, DSUseModel2, DSUseModelOld, DSAsync)
+}
+
+
+# --- воркери для вимірювання пропускної здатності ---
+
+_worker_pipeline: Pipeline | None = None
+
+
+def _init_worker(name: str):
+    global _worker_pipeline
+    os.chdir(ROOT)
+    _worker_pipeline = PIPELINES[name]()
+    _worker_pipeline.load()
+
+
+def _ready(_):
+    time.sleep(0.2)  # щоб кожен воркер отримав хоча б одне завдання
+    return os.getpid()
+
+
+def _run_path(path: str) -> str:
+    try:
+        return _worker_pipeline.run(Path(path), StageTimer())
+    except Exception:  # noqa: BLE001 - помилка конвеєра = нерозпізнане фото
+        return "ERROR"
+
+
+def throughput(name: str, paths: list[Path], workers: int, repeat: int) -> float:
+    """зображень/с з workers процесами (моделі завантажені заздалегідь)"""
+    jobs = [str(path) for path in paths] * repeat
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(name,),
+    ) as pool:
+        list(pool.map(_ready, range(workers)))
+        started = time.perf_counter()
+        list(pool.map(_run_path, jobs))
+        return len(jobs) / (time.perf_counter() - started)
+
+
+def summarize(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    summary = {"count": len(values), "mean": float(np.mean(values))}
+    for p in PERCENTILES:
+        summary[f"p{p}"] = float(np.percentile(values, p))
+    return summary
+
+
+def run_pipeline(name: str, max_workers: int, repeat: int) -> dict:
+    paths = labelled_images()
+    pipeline = PIPELINES[name]()
+
+    started = time.perf_counter()
+    pipeline.load()
+    load_s = time.perf_counter() - started
+    pipeline.run(paths[0], StageTimer())  # прогрів
+
+    stages = defaultdict(list)
+    predictions, errors, correct = {}, 0, 0
+    for _ in range(repeat):
+        for path in paths:
+            timer = StageTimer()
+            started = time.perf_counter()
+            try:
+                number = pipeline.run(path, timer)
+            except Exception as err:  # noqa: BLE001
+                number = f"ERROR: {type(err).__name__}: {err}"
+                errors += 1
+            timer.timings["total"] = (time.perf_counter() - started) * 1000
+            for stage, elapsed in timer.timings.items():
+                stages[stage].append(elapsed)
+            predictions[path.name] = number
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    for path in paths:
+        correct += predictions[path.name] == label(path)
+
+    images_per_s = {}
+    for workers in range(1, max_workers + 1):
+        images_per_s[workers] = throughput(name, paths, workers, repeat)
+
+    return {
+        "pipeline": name,
+        "images": len(paths),
+        "repeat": repeat,
+        "load_s": load_s,
+        "latency_ms": {stage: summarize(stages[stage]) for stage in STAGES},
+        "throughput": images_per_s,
+        "rss_mb": rss_mb,
+        "worker_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "accuracy": correct / len(paths),
+        "correct": correct,
+        "errors": errors,
+        "predictions": predictions,
+    }
+
+
+def print_result(result: dict, baseline: dict | None = None):
+    print(
+        f"{result['pipeline']}: accuracy {result['correct']}/{result['images']} "
+        f"({result['accuracy']:.1%}), errors {result['errors']}, "
+        f"load {result['load_s']:.1f} s, peak RSS {result['rss_mb']:.0f} MB "
+        f"(workers {result['worker_rss_mb']:.0f} MB)"
+    )
+    for stage, summary in result["latency_ms"].items():
+        if summary["count"] == 0:
+            continue
+        line = f"  {stage:<9}" + "".join(
+            f"  p{p} {summary[f'p{p}']:8.1f} ms" for p in PERCENTILES
+        )
+        line += f"  (n={summary['count']})"
+        print(line)
+    print(
+        "  throughput "
+        + ", ".join(f"{w}w {ips:.2f} img/s" for w, ips in result["throughput"].items())
+    )
+
+    if baseline is not None:
+        before = baseline["latency_ms"]["total"].get("p95")
+        after = result["latency_ms"]["total"].get("p95")
+        line = f"  vs baseline: accuracy {baseline['accuracy']:.1%} -> {result['accuracy']:.1%}"
+        if before and after:
+            line += f", total p95 {before:.1f} -> {after:.1f} ms"
+        print(line)
+        changed = [
+            name
+            for name, number in result["predictions"].items()
+            if baseline["predictions"].get(name) not in (None, number)
+        ]
+        if changed:
+            print(f"  changed predictions: {', '.join(sorted(changed))}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pipelines", nargs="+", default=list(PIPELINES))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_pipeline(args.child, args.workers, args.repeat)))
+        return
+
+    baseline = {}
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["pipelines"]
+
+    # кожен конвеєр - в окремому процесі, щоб пам'ять та моделі не змішувались
+    results = {}
+    for name in args.pipelines:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--child",
+                name,
+                "--workers",
+                str(args.workers),
+                "--repeat",
+                str(args.repeat),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            error = (completed.stderr.strip().splitlines() or ["unknown error"])[-1]
+            print(f"{name}: failed - {error}")
+            results[name] = {"pipeline": name, "error": error}
+            continue
+        results[name] = json.loads(completed.stdout.strip().splitlines()[-1])
+        previous = baseline.get(name)
+        print_result(results[name], previous if previous and "error" not in previous else None)
+
+    output = args.output or RESULTS_DIR / f"pipelines-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "python": sys.version.split()[0],
+                "cpu_count": os.cpu_count(),
+                "pipelines": results,
+            },
+            indent=2,
+            ensure_ascii=False,
+        )
+    )
+    print(f"\nresults: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Порівняння затримки класифікації символів на один номер:
+посимвольний model.predict (як було) проти пакетного prediction_number.
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_prediction.py
+"""
+import os
+import sys
+import time
+from pathlib import Path
+from statistics import mean, median
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)  # шляхи до моделей у use_model відносні до кореня проєкту
+
+from src.services import use_model  # noqa: E402
+
+IMAGES_DIR = Path("DS/images")
+REPEAT = 5
+
+
+def prediction_number_per_char(char):
+    """попередня реалізація: окремий model.predict на кожен символ"""
+    output = []
+    for ch in char:
+        # полотна символів тепер uint8, раніше - float64
+        img_ = cv2.resize(ch.astype(np.float64), (28, 28), interpolation=cv2.INTER_AREA)
+        img = use_model.fix_dimension(img_).reshape(1, 28, 28, 3)
+        y_proba = use_model.recognizer.model.predict(img)[0]
+        output.append(use_model.CHARACTERS[np.argmax(y_proba)])
+    return "".join(output)
+
+
+def timed(func, chars):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        result = func(chars)
+    return (time.perf_counter() - started) / REPEAT * 1000, result
+
+
+def main():
+    rows = []
+    for path in sorted(IMAGES_DIR.glob("*.jpg")):
+        img = cv2.imread(str(path))
+        try:
+            _, plate, _ = use_model.detect_plate(img)
+        except UnboundLocalError:
+            continue
+        chars = use_model.segment_characters(plate, echo=False)
+        if len(chars) == 0:
+            continue
+
+        # прогрів, щоб не рахувати побудову графа
+        prediction_number_per_char(chars)
+        use_model.prediction_number(chars)
+
+        before_ms, before = timed(prediction_number_per_char, chars)
+        after_ms, after = timed(use_model.prediction_number, chars)
+        rows.append((path.stem, len(chars), before_ms, after_ms, before == after))
+        print(
+            f"{path.stem:<16}{len(chars):>4} chars"
+            f"{before_ms:>10.1f} ms{after_ms:>10.1f} ms"
+            f"{'':>4}{'same' if before == after else 'DIFF'}"
+        )
+
+    if not rows:
+        print("No plates detected")
+        return
+
+    before_all = [r[2] for r in rows]
+    after_all = [r[3] for r in rows]
+    print()
+    print(f"plates: {len(rows)}")
+    print(f"per-char  mean {mean(before_all):.1f} ms, median {median(before_all):.1f} ms")
+    print(f"batched   mean {mean(after_all):.1f} ms, median {median(after_all):.1f} ms")
+    print(f"speedup   x{mean(before_all) / mean(after_all):.1f}")
+    print(f"identical results: {sum(r[4] for r in rows)}/{len(rows)}")
+
+
+if __name__ == "__main__":
+    main()
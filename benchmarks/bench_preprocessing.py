@@ -0,0 +1,140 @@
+"""
+Підготовка символів до класифікатора: посимвольний цикл (як було) проти
+пакетної підготовки у попередньо виділеному float32 буфері (CharacterBatch).
+
+Перевіряє побітовий збіг входу моделі та звітує затримку на один номер
+для номерів з DS/images і для синтетичних номерів з 6-12 символами.
+Модель не потрібна - лише каскад для пошуку номерів.
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_preprocessing.py
+"""
+import os
+import sys
+import time
+from pathlib import Path
+from statistics import mean, median
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)  # шляхи до моделей у use_model відносні до кореня проєкту
+
+from src.services import use_model  # noqa: E402
+from src.services.preprocessing import CharacterBatch  # noqa: E402
+
+IMAGES_DIR = Path("DS/images")
+REPEAT = 200
+SYNTHETIC = 200
+
+
+def old_fix_dimension(img):
+    new_img = np.zeros((28, 28, 3))
+    for i in range(3):
+        new_img[:, :, i] = img
+    return new_img
+
+
+def old_prepare(binary_img, rects):
+    """попередня реалізація: find_contours + prepare_characters по одному символу"""
+    img_res = []
+    for x, y, w, h in rects:
+        char_copy = np.zeros((44, 24))
+        char = cv2.resize(binary_img[y : y + h, x : x + w], (20, 40))
+        char = cv2.subtract(255, char)
+        char_copy[2:42, 2:22] = char
+        img_res.append(char_copy)
+    return np.stack(
+        [
+            old_fix_dimension(cv2.resize(ch, (28, 28), interpolation=cv2.INTER_AREA))
+            for ch in img_res
+        ]
+    ).astype(np.float32)
+
+
+def plate_rects(binary_img):
+    """прямокутники символів так само, як у use_model.find_contours"""
+    h, w = binary_img.shape
+    lower_width, upper_width = h / 6, h / 2
+    lower_height, upper_height = w / 10, 2 * w / 3
+    cntrs, _ = cv2.findContours(binary_img.copy(), cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    cntrs = sorted(cntrs, key=cv2.contourArea, reverse=True)[:15]
+    rects = [
+        rect
+        for rect in map(cv2.boundingRect, cntrs)
+        if lower_width < rect[2] < upper_width and lower_height < rect[3] < upper_height
+    ]
+    return sorted(rects, key=lambda rect: rect[0])
+
+
+def binary_plate(plate):
+    img_lp = cv2.resize(plate, (333, 75))
+    gray = cv2.cvtColor(img_lp, cv2.COLOR_BGR2GRAY)
+    _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    binary = cv2.dilate(cv2.erode(binary, (3, 3)), (3, 3))
+    binary[0:3, :] = binary[:, 0:3] = binary[72:75, :] = binary[:, 330:333] = 255
+    return binary
+
+
+def real_plates():
+    plates = []
+    for path in sorted(IMAGES_DIR.glob("*.jpg")):
+        try:
+            _, plate, _ = use_model.detect_plate(cv2.imread(str(path)), draw=False)
+        except UnboundLocalError:
+            continue
+        binary = binary_plate(plate)
+        rects = plate_rects(binary)
+        if rects:
+            plates.append((path.stem, binary, rects))
+    return plates
+
+
+def synthetic_plates(rng):
+    plates = []
+    for i in range(SYNTHETIC):
+        binary = ((rng.random((75, 333)) > 0.5) * 255).astype(np.uint8)
+        rects = []
+        for _ in range(rng.integers(6, 13)):
+            w, h = int(rng.integers(8, 37)), int(rng.integers(34, 50))
+            x, y = int(rng.integers(0, 333 - w)), int(rng.integers(0, 75 - h))
+            rects.append((x, y, w, h))
+        plates.append((f"synthetic-{i}", binary, sorted(rects)))
+    return plates
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        func(*args)
+    return (time.perf_counter() - started) / REPEAT * 1000
+
+
+def report(title, plates, batch):
+    if not plates:
+        print(f"{title}: no plates")
+        return
+    before, after, identical = [], [], 0
+    for _, binary, rects in plates:
+        identical += np.array_equal(
+            old_prepare(binary, rects), batch.prepare(binary, rects)
+        )
+        before.append(timed(old_prepare, binary, rects))
+        after.append(timed(batch.prepare, binary, rects))
+    print(f"{title}: {len(plates)} plates")
+    print(f"  per-char  mean {mean(before):.3f} ms, median {median(before):.3f} ms")
+    print(f"  batched   mean {mean(after):.3f} ms, median {median(after):.3f} ms")
+    print(f"  speedup   x{mean(before) / mean(after):.1f}")
+    print(f"  byte-identical: {identical}/{len(plates)}")
+
+
+def main():
+    batch = CharacterBatch()
+    report("DS/images", real_plates(), batch)
+    report("synthetic", synthetic_plates(np.random.default_rng(0)), batch)
+
+
+if __name__ == "__main__":
+    main()
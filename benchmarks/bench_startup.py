@@ -0,0 +1,45 @@
+"""
+Час старту API: імпорт main без моделей розпізнавання
+та імпорт main з примусовим завантаженням моделей (recognizer.warm_up).
+
+Кожен варіант запускається в окремому процесі інтерпретатора.
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_startup.py
+"""
+import subprocess
+import sys
+import time
+from pathlib import Path
+from statistics import mean, median
+
+ROOT = Path(__file__).resolve().parents[1]
+REPEAT = 3
+
+CASES = {
+    "import main": "import main",
+    "import main + models": (
+        "import main\n"
+        "from src.services.use_model import recognizer\n"
+        "recognizer.warm_up()"
+    ),
+}
+
+
+def run(code: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+    return time.perf_counter() - started
+
+
+def main():
+    for name, code in CASES.items():
+        timings = [run(code) for _ in range(REPEAT)]
+        print(
+            f"{name:<24} mean {mean(timings):6.2f} s"
+            f"   median {median(timings):6.2f} s   min {min(timings):6.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,10 @@
 # import pickle
 # from typing import Annotated, Callable
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Depends, HTTPException, requests, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi_limiter import FastAPILimiter
 from fastapi.middleware.cors import CORSMiddleware
 # from fastapi.staticfiles import StaticFiles
@@ -18,8 +19,17 @@ import uvicorn
 # from src.models.models import User
 
 # from src.routes import photos
-from src.database.db import get_db
+from src.database.db import db_pool_metrics, get_db, sessionmanager
 from src.conf.config import config
+from src.services.recognition import (
+    RecognitionTimeout,
+    recognition_executor,
+    recognition_cache,
+)
+from src.services.recognition_metrics import recognition_metrics
+from src.services.occupancy import occupancy
+from src.services.reference_cache import reference_cache
+from src.repository.vehicles import count_free_parking_space
 
 from src.routes import (
     auth,
@@ -31,6 +41,7 @@ from src.routes import (
     utilities,
     seed,
     session,
+    camera,
 )
 
 # from src.services.auth import auth_service
@@ -56,8 +67,29 @@ async def lifespan(app: FastAPI):
     )
 
     delay = await FastAPILimiter.init(r)
+
+    if config.RECOGNITION_CACHE_REDIS:
+        recognition_cache.redis = r
+    recognition_executor.start()
+    if config.RECOGNITION_WARMUP:
+        await recognition_executor.warm_up()
+
+    occupancy.redis = r
+    reference_cache.redis = r
+    reconciler = asyncio.create_task(
+        occupancy.keep_reconciled(
+            count_free_parking_space,
+            sessionmanager.session,
+            config.OCCUPANCY_RECONCILE_INTERVAL,
+        )
+    )
+
     yield delay
 
+    reconciler.cancel()
+    recognition_executor.shutdown()
+    await sessionmanager.close()
+
 
 # start = True
 
@@ -92,10 +124,19 @@ app.add_middleware(
 
 # app.mount("/static", StaticFiles(directory=BASE_DIR / "src" / "static"), name="static")
 
+@app.exception_handler(RecognitionTimeout)
+async def recognition_timeout_handler(request: Request, exc: RecognitionTimeout):
+    """розпізнавання не вклалося в RECOGNITION_TIMEOUT - 504 Gateway Timeout"""
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT, content={"detail": str(exc)}
+    )
+
+
 app.include_router(auth.auth_router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(vehicles.router, prefix="/api")
 app.include_router(session.router, prefix="/api")
+app.include_router(camera.router, prefix="/api")
 app.include_router(payments.router, prefix="/api")
 app.include_router(rates.router, prefix="/api")
 app.include_router(settings.router, prefix="/api")
@@ -144,5 +185,23 @@ async def healthchecker(db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Error connecting to the database")
 
 
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Метрики розпізнавання у текстовому форматі Prometheus: гістограми
+    тривалості етапів (decode, cascade, segment, classify, ocr) та
+    впевненості, лічильники розпізнавань з OCR-резервом та з кешу,
+    влучання та промахи кешу розпізнавання. Також метрики пулу з'єднань
+    з базою: очікування з'єднання, таймаути, зайняті з'єднання та
+    завантаженість пулу.
+    """
+    return (
+        recognition_metrics.render()
+        + recognition_cache.render()
+        + db_pool_metrics.render(sessionmanager.pool)
+    )
+
+
 if __name__ == "__main__":
     uvicorn.run(app="main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,79 @@
+"""
+Експорт моделі класифікатора символів з Keras у ONNX та TFLite
+для бекендів onnxruntime / tflite (RECOGNITION_BACKEND=onnx|tflite).
+
+Потрібні пакети: tensorflow, tf2onnx.
+
+Запуск з кореня проєкту:
+    python scripts/export_model.py
+    python scripts/export_model.py --model src/models/model_ua_license_plate.keras --formats onnx
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_MODEL = ROOT / "src/models/model_ua_license_plate.keras"
+OPSET = 13
+
+
+def export_saved_model(model_path: Path, saved_model_dir: Path):
+    from keras.models import load_model
+
+    model = load_model(model_path, compile=False)
+    model.export(str(saved_model_dir), format="tf_saved_model")
+
+
+def export_onnx(saved_model_dir: Path, output: Path):
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "tf2onnx.convert",
+            "--saved-model",
+            str(saved_model_dir),
+            "--output",
+            str(output),
+            "--opset",
+            str(OPSET),
+        ],
+        check=True,
+    )
+
+
+def export_tflite(saved_model_dir: Path, output: Path):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(str(saved_model_dir))
+    output.write_bytes(converter.convert())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", type=Path, default=DEFAULT_MODEL)
+    parser.add_argument(
+        "--formats", nargs="+", choices=("onnx", "tflite"), default=("onnx", "tflite")
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        saved_model_dir = Path(tmp) / "saved_model"
+        export_saved_model(args.model, saved_model_dir)
+
+        if "onnx" in args.formats:
+            output = args.model.with_suffix(".onnx")
+            export_onnx(saved_model_dir, output)
+            print(f"ONNX   -> {output}")
+        if "tflite" in args.formats:
+            output = args.model.with_suffix(".tflite")
+            export_tflite(saved_model_dir, output)
+            print(f"TFLite -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Підбір параметрів каскаду виявлення номерних знаків: перебір scaleFactor,
+minNeighbors та зменшення кадру (detect_min_side) на DS/images.
+
+Для кожної комбінації рахуються повнота виявлення (номер знайдено і з нього
+виділено стільки символів, скільки в номері з назви файлу) та медіанний час
+декодування кадру для каскаду разом з виявленням. Серед Парето-оптимальних
+комбінацій (жодна інша не краща водночас за повнотою і часом) обирається
+найшвидша з повнотою не нижче найкращої мінус --tolerance. Вона
+записується у JSON (RECOGNITION_CASCADE_PARAMS), який воркери розпізнавання
+завантажують при старті.
+
+Модель класифікатора не потрібна - лише каскад.
+
+Запуск з кореня проєкту:
+    python scripts/tune_cascade.py
+    python scripts/tune_cascade.py --scale-factors 1.1 1.2 1.3 --min-neighbors 5 7 --dry-run
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import product
+from pathlib import Path
+from statistics import median
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)  # шляхи до моделей у use_model відносні до кореня проєкту
+
+from src.services.use_model import (  # noqa: E402
+    MODEL_CASCADE,
+    PlateRecognizer,
+    decode_photo,
+    segment_characters,
+)
+
+IMAGES_DIR = Path("DS/images")
+# збігається з RECOGNITION_CASCADE_PARAMS за замовчуванням
+DEFAULT_OUTPUT = Path("src/models/cascade_params.json")
+
+SCALE_FACTORS = (1.05, 1.1, 1.15, 1.2, 1.3, 1.4, 1.5)
+MIN_NEIGHBORS = (3, 4, 5, 6, 7, 8, 9)
+# 200 - кадр зменшується в 4 рази, 400 - в 2, 1600 - повний кадр (для DS/images)
+DETECT_MIN_SIDES = (200, 400, 800, 1600)
+REPEAT = 3
+
+
+def label(path: Path) -> str:
+    """номер з назви файлу: AE1455KH_f.jpg -> AE1455KH"""
+    return path.stem.split("_")[0]
+
+
+def load_images(images_dir: Path):
+    images = []
+    for path in sorted(images_dir.glob("*.jpg")):
+        photo = path.read_bytes()
+        images.append((label(path), photo, decode_photo(photo)))
+    return images
+
+
+def evaluate(recognizer: PlateRecognizer, images, repeat: int) -> tuple[float, float]:
+    """
+    Повнота виявлення та медіанний час (мс, найкращий з repeat повторів)
+    для поточних параметрів recognizer.
+    """
+    hits, timings = 0, []
+    for number, photo, img in images:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            detection = recognizer.detection_input(photo, img.shape)
+            plate_rect = recognizer.detect_plate_rects(img, detection)
+            best = min(best, time.perf_counter() - started)
+        timings.append(best * 1000)
+
+        if len(plate_rect) > 0:
+            x, y, w, h = plate_rect[-1]
+            symbols = segment_characters(img[y : y + h, x : x + w], echo=False)
+            hits += len(symbols) == len(number)
+    return hits / len(images), median(timings)
+
+
+def pareto_front(results: list[dict]) -> list[dict]:
+    """комбінації, для яких немає швидшої з такою ж або вищою повнотою"""
+    front, best_recall = [], -1.0
+    for result in sorted(results, key=lambda r: (r["ms"], -r["recall"])):
+        if result["recall"] > best_recall:
+            front.append(result)
+            best_recall = result["recall"]
+    return front
+
+
+def choose(front: list[dict], tolerance: float) -> dict:
+    """найшвидша комбінація з повнотою не нижче найкращої мінус tolerance"""
+    top = max(result["recall"] for result in front)
+    return min(
+        (result for result in front if result["recall"] >= top - tolerance),
+        key=lambda r: r["ms"],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=Path, default=IMAGES_DIR)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--scale-factors", type=float, nargs="+", default=SCALE_FACTORS)
+    parser.add_argument("--min-neighbors", type=int, nargs="+", default=MIN_NEIGHBORS)
+    parser.add_argument("--min-sides", type=int, nargs="+", default=DETECT_MIN_SIDES)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.0,
+        help="допустима втрата повноти заради швидкості (частка, наприклад 0.05)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="лише звіт, без запису")
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    if not images:
+        sys.exit(f"no images in {args.images}")
+    recognizer = PlateRecognizer(cascade_path=str(ROOT / MODEL_CASCADE))
+
+    results = []
+    for scale_factor, min_neighbors, min_side in product(
+        args.scale_factors, args.min_neighbors, args.min_sides
+    ):
+        recognizer.configure(
+            scale_factor=scale_factor, min_neighbors=min_neighbors, detect_min_side=min_side
+        )
+        recall, ms = evaluate(recognizer, images, args.repeat)
+        results.append(
+            {
+                "scale_factor": scale_factor,
+                "min_neighbors": min_neighbors,
+                "detect_min_side": min_side,
+                "recall": round(recall, 4),
+                "ms": round(ms, 3),
+            }
+        )
+
+    front = pareto_front(results)
+    chosen = choose(front, args.tolerance)
+
+    print(f"images: {len(images)}, combinations: {len(results)}")
+    print(f"{'':2}{'scale':>6} {'neigh':>6} {'side':>6} {'recall':>7} {'ms':>9}")
+    for result in sorted(results, key=lambda r: (-r["recall"], r["ms"])):
+        mark = ">" if result is chosen else "*" if result in front else ""
+        print(
+            f"{mark:2}{result['scale_factor']:>6} {result['min_neighbors']:>6} "
+            f"{result['detect_min_side']:>6} {result['recall']:>7.2%} {result['ms']:>9.3f}"
+        )
+    print("* - Парето-оптимальні, > - обрані")
+
+    if args.dry_run:
+        return
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps(
+            {
+                **chosen,
+                "images": len(images),
+                "tolerance": args.tolerance,
+                "tuned_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "pareto": front,
+            },
+            indent=2,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    print(f"-> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
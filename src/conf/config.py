@@ -16,6 +16,17 @@ class Settings(BaseSettings):
 
     DB_URL: str
     TEST_DB_URL: str
+    # пул з'єднань з базою (для sqlite не застосовується)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20  # додаткові з'єднання понад DB_POOL_SIZE під піком
+    DB_POOL_TIMEOUT: float = 30  # секунди очікування вільного з'єднання
+    DB_POOL_RECYCLE: int = 1800  # секунди, після яких з'єднання відкривається заново (-1 - ніколи)
+    # перевірка з'єднання перед видачею - зайвий запит на кожен checkout
+    DB_POOL_PRE_PING: bool = False
+    # кеш підготовлених запитів asyncpg на з'єднання (0 - вимкнено, для pgbouncer)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # попередження в лог, якщо з'єднання з пулу довелося чекати довше (мілісекунди)
+    DB_SLOW_CHECKOUT_MS: float = 100
 
     SECRET_KEY_JWT: str
     ALGORITHM: str
@@ -35,6 +46,60 @@ class Settings(BaseSettings):
     CLOUDINARY_API_KEY: str
     CLOUDINARY_API_SECRET: str
 
+    # розпізнавання номерів: кількість процесів-воркерів (0 - пул потоків)
+    RECOGNITION_WORKERS: int = 2
+    RECOGNITION_MP_CONTEXT: str = "spawn"
+    # завантажувати моделі при старті застосунку, а не при першому запиті
+    RECOGNITION_WARMUP: bool = False
+    # бекенд класифікатора символів: keras, onnx або tflite
+    RECOGNITION_BACKEND: str = "keras"
+    # параметри каскаду виявлення номерних знаків
+    RECOGNITION_SCALE_FACTOR: float = 1.4
+    RECOGNITION_MIN_NEIGHBORS: int = 7
+    # кадр для каскаду зменшується не більше ніж до цієї сторони (пікселі)
+    RECOGNITION_DETECT_MIN_SIDE: int = 800
+    # параметри каскаду, підібрані scripts/tune_cascade.py (замінюють три попередні)
+    RECOGNITION_CASCADE_PARAMS: str = "src/models/cascade_params.json"
+    # кеш результатів розпізнавання за хешем зображення
+    RECOGNITION_CACHE_SIZE: int = 512
+    RECOGNITION_CACHE_TTL: int = 60  # секунди
+    RECOGNITION_CACHE_REDIS: bool = False
+    # додавати етапи розпізнавання (тривалість, OCR-резерв) у відповідь /session/in та /out
+    RECOGNITION_DEBUG: bool = False
+    # ліміт часу на розпізнавання одного фото, секунди (0 - без ліміту);
+    # пакетний запит отримує цей ліміт на кожне фото, якого немає в кеші
+    RECOGNITION_TIMEOUT: float = 30
+    # кільце кадрів у спільній пам'яті для передачі фото воркерам (0 слотів - pickle)
+    RECOGNITION_FRAME_SLOTS: int = 8
+    RECOGNITION_FRAME_SLOT_SIZE: int = 8 * 1024 * 1024  # байти, більші фото - через pickle
+    # максимальна кількість зображень в одному пакетному запиті
+    RECOGNITION_BATCH_MAX: int = 100
+    # найбільший розмір зображення та всіх зображень пакета (після розпакування zip), байти
+    RECOGNITION_IMAGE_MAX_BYTES: int = 10_485_760
+    RECOGNITION_BATCH_MAX_BYTES: int = 104_857_600
+
+    # повторні події на шлагбаумі (/session/in та /out з параметром gate):
+    # скільки секунд пам'ятати номер і хеш кадру, допустима відстань між хешами
+    # та скільки шлагбаумів пам'ятати. На DS/images (benchmarks/bench_gate_hash.py)
+    # повторні кадри дають 0-10 біт (89% - до 4), різні машини - від 14 біт;
+    # у нерухомої камери фон спільний, тож поріг лишається з запасом
+    GATE_REPEAT_WINDOW: int = 15
+    GATE_REPEAT_HASH_DISTANCE: int = 4
+    GATE_REPEAT_MAX_GATES: int = 64
+
+    # лічильник вільних місць у Redis: як часто звіряти його з базою та
+    # як часто надсилати keep-alive табло (server-sent events), секунди
+    OCCUPANCY_RECONCILE_INTERVAL: float = 60
+    OCCUPANCY_STREAM_INTERVAL: float = 15
+
+    # кеш тарифів та налаштувань: як часто звіряти версію в Redis, секунди
+    REFERENCE_CACHE_CHECK_INTERVAL: float = 5
+
+    # потік кадрів з камери (WebSocket)
+    CAMERA_FRAME_SKIP: int = 2  # скільки кадрів пропускати між виявленнями
+    CAMERA_STABLE_FRAMES: int = 3  # скільки виявлень поспіль номер має стояти на місці
+    CAMERA_LOST_FRAMES: int = 10  # після скількох виявлень без номера машина вважається новою
+
     # нахіба?
     @field_validator("ALGORITHM")
     @classmethod
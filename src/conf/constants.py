@@ -45,6 +45,9 @@ NOT_NUMBER = [
     "61338",
 ]
 
+# мінімальна ймовірність кожного символу, за якої номер приймається без OCR
+CHAR_CONFIDENCE_THRESHOLD = 0.9
+
 IMAGES = []
 IMAGE_PATH = ''
 # IMAGE_PATH_LENGTH = 250
@@ -1,24 +1,175 @@
 import contextlib
+import logging
+import threading
+import time
 
 from os import environ
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
 
 from src.conf.config import config
+from src.services.metrics import Histogram
 
 TESTING = environ.get("TESTING")
 
+logger = logging.getLogger(__name__)
+
+# межі кошиків гістограми очікування з'єднання (секунди)
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
 # from sqlalchemy.orm import DeclarativeBase # переставив до models.models.py
 # class Base(DeclarativeBase): ...
 
 
+class PoolMetrics:
+    """
+    Метрики пулу з'єднань з базою: гістограма очікування з'єднання
+    (checkout), лічильники видач і таймаутів; розмір пулу, зайняті
+    з'єднання та завантаженість знімаються з пулу під час render.
+    """
+
+    def __init__(self, slow_checkout_ms: float):
+        self._lock = threading.Lock()
+        self.slow_checkout_ms = slow_checkout_ms
+        self.wait_seconds = Histogram(
+            "db_pool_checkout_wait_seconds",
+            "Time spent waiting for a connection from the pool",
+            CHECKOUT_BUCKETS,
+        )
+        self.checkouts = 0
+        self.slow = 0
+        self.timeouts = 0
+
+    def record(self, pool: QueuePool, waited: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds.observe(waited)
+            slow = waited * 1000 >= self.slow_checkout_ms
+            self.slow += slow
+        if slow:
+            logger.warning(
+                "slow db pool checkout: waited %.1f ms (checked out %d, pool size %d, overflow %d)",
+                waited * 1000,
+                pool.checkedout(),
+                pool.size(),
+                pool.overflow(),
+            )
+
+    def record_timeout(self, pool: QueuePool):
+        with self._lock:
+            self.timeouts += 1
+        logger.error(
+            "db pool exhausted: no connection within %s s (pool size %d, overflow %d)",
+            pool.timeout(),
+            pool.size(),
+            pool.overflow(),
+        )
+
+    def render(self, pool: Pool | None) -> str:
+        with self._lock:
+            lines = [
+                *self.wait_seconds.render(),
+                "# HELP db_pool_checkouts_total Connections checked out from the pool",
+                "# TYPE db_pool_checkouts_total counter",
+                f"db_pool_checkouts_total {self.checkouts}",
+                "# HELP db_pool_slow_checkouts_total Checkouts that waited longer than DB_SLOW_CHECKOUT_MS",
+                "# TYPE db_pool_slow_checkouts_total counter",
+                f"db_pool_slow_checkouts_total {self.slow}",
+                "# HELP db_pool_timeouts_total Checkouts that failed after DB_POOL_TIMEOUT",
+                "# TYPE db_pool_timeouts_total counter",
+                f"db_pool_timeouts_total {self.timeouts}",
+            ]
+        if isinstance(pool, TimedQueuePool):
+            # size() - постійні з'єднання, overflow() - додаткові (від'ємне, поки пул не заповнено)
+            capacity = pool.size() + max(pool.max_overflow, 0)
+            checked_out = pool.checkedout()
+            lines += [
+                "# HELP db_pool_size Configured number of persistent connections",
+                "# TYPE db_pool_size gauge",
+                f"db_pool_size {pool.size()}",
+                "# HELP db_pool_checked_out Connections currently in use",
+                "# TYPE db_pool_checked_out gauge",
+                f"db_pool_checked_out {checked_out}",
+                "# HELP db_pool_overflow Connections opened beyond db_pool_size",
+                "# TYPE db_pool_overflow gauge",
+                f"db_pool_overflow {max(pool.overflow(), 0)}",
+                "# HELP db_pool_utilization Checked out connections to pool size plus max overflow",
+                "# TYPE db_pool_utilization gauge",
+                f"db_pool_utilization {checked_out / capacity if capacity else 0}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+db_pool_metrics = PoolMetrics(config.DB_SLOW_CHECKOUT_MS)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул з'єднань, що вимірює, скільки запит чекав на з'єднання
+    (включно з відкриттям нового), і пише це в db_pool_metrics.
+    Налаштований max_overflow зберігається для метрики завантаженості.
+    """
+
+    def __init__(self, creator, pool_size=5, max_overflow=10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self.max_overflow = max_overflow
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            db_pool_metrics.record_timeout(self)
+            raise
+        db_pool_metrics.record(self, time.perf_counter() - started)
+        return connection
+
+
+def engine_options(url: str) -> dict:
+    """
+    Параметри create_async_engine з налаштувань: розмір пулу, таймаут,
+    recycle, pre-ping та кеш підготовлених запитів asyncpg. Для sqlite
+    (тести) пул лишається типовим для діалекту.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE
+        }
+    return options
+
+
 class DatabaseSessionManager:
     def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
+        self._engine: AsyncEngine | None = create_async_engine(url, **engine_options(url))
         self._session_maker: async_sessionmaker = async_sessionmaker(
             autocommit=False, autoflush=False, bind=self._engine
         )
 
+    @property
+    def pool(self) -> Pool | None:
+        return self._engine.pool if self._engine is not None else None
+
+    async def close(self):
+        """закриває всі з'єднання пулу (при зупинці застосунку)"""
+        if self._engine is None:
+            return
+        await self._engine.dispose()
+        self._engine = None
+        self._session_maker = None
+
     @contextlib.asynccontextmanager
     async def session(self):
         if self._session_maker is None:
@@ -26,9 +177,14 @@ class DatabaseSessionManager:
         session = self._session_maker()
         try:
             yield session
-        except Exception as e:
-            print(e)
+        except exc.SQLAlchemyError as e:
+            logger.warning("database session rolled back: %s", e)
+            await session.rollback()
+            raise
+        except Exception:
+            # HTTPException з маршруту та інші помилки - відкат без запису в лог
             await session.rollback()
+            raise
         finally:
             await session.close()
 
@@ -9,7 +9,9 @@ from sqlalchemy import (
     Enum,
     ForeignKey,
     Boolean,
-    Date
+    Date,
+    Index,
+    text
 )
 
 from sqlalchemy.sql.sqltypes import DateTime
@@ -85,8 +87,8 @@ class Vehicle(Base, Datefield):
     license_plate: Mapped[str] = mapped_column(
         String(LICENSE_PLATE_MAX_LENGTH), nullable=False, unique=True
     )
-    ended_at: Mapped[date] = mapped_column(Date, nullable=True)
-    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=True)
+    ended_at: Mapped[date] = mapped_column(Date, nullable=True, index=True)
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=True, index=True)
     rate_id:  Mapped[int] = mapped_column(
         ForeignKey("rates.id"), nullable=False
     )
@@ -99,7 +101,7 @@ class Blacklist(Base, Datefield):
         ForeignKey("users.id"), nullable=False
     )
     vehicle_id: Mapped[int] = mapped_column(
-        ForeignKey("vehicles.id"), nullable=False
+        ForeignKey("vehicles.id"), nullable=False, index=True
     )
     reason: Mapped[str] = mapped_column(String(COMMENT_MAX_LENGTH), nullable=False)
     vehicle: Mapped["Vehicle"] = relationship(
@@ -122,9 +124,20 @@ class Notification(Base, Datefield):
 
 class Parking_session(Base, Datefield):
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_updated_at", "updated_at"),
+        # не більше однієї відкритої сесії на машину (і швидкий пошук відкритих сесій)
+        Index(
+            "uq_sessions_open_vehicle",
+            "vehicle_id",
+            unique=True,
+            postgresql_where=text("updated_at IS NULL"),
+            sqlite_where=text("updated_at IS NULL"),
+        ),
+    )
     id:  Mapped[int] = mapped_column(Integer, primary_key=True)
     vehicle_id: Mapped[int] = mapped_column(
-        ForeignKey("vehicles.id"), nullable=False
+        ForeignKey("vehicles.id"), nullable=False, index=True
     )
 
 class Payment(Base):
@@ -134,10 +147,10 @@ class Payment(Base):
         ForeignKey("users.id"), nullable=False
     )
     vehicle_id: Mapped[int] = mapped_column(
-        ForeignKey("vehicles.id"), nullable=False
+        ForeignKey("vehicles.id"), nullable=False, index=True
     )
     session_id: Mapped[int] = mapped_column(
-        ForeignKey("sessions.id"), nullable=True
+        ForeignKey("sessions.id"), nullable=True, index=True
         #  може бути оплата за місяць
     )
     created_at: Mapped[date] = mapped_column("created_at", DateTime, default=func.now())
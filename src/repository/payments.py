@@ -1,6 +1,5 @@
 from fastapi import Depends, HTTPException, status
 from sqlalchemy import select, func, desc
-from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 from math import ceil
 from typing import Optional
@@ -8,9 +7,10 @@ from datetime import timedelta, datetime
 
 from src.conf import messages
 from src.database.db import get_db
-from src.models.models import Vehicle, Payment, Parking_session, Rate
+from src.models.models import Vehicle, Payment, Parking_session
 from sqlalchemy import update
 from src.conf.constants import DAYS_IN_MONTH
+from src.services.reference_cache import reference_cache
 
 
 async def find_vehicle_id_by_plate(license_plate: str, db: AsyncSession):
@@ -288,22 +288,19 @@ async def get_last_payments(license_plate: str, db: AsyncSession):
 
 async def get_rate_by_name(name: str, db: AsyncSession):
     """
-    Get the rate by name.
+    Get the rate by name (from the rates cache).
     :param name: str
     :db: AsyncSession
     :return: int
     """
 
-    stmt = select(Rate).where(Rate.rate_name == name.lower())
-    try:
-        result = await db.execute(stmt)
-        rate = result.scalar_one()
-        return rate.price
-    except NoResultFound:
+    rate = await reference_cache.rate(name, db)
+    if rate is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=messages.RATE_NOT_FOUND + ": " + name
         )
+    return rate.price
 
 
 async def calculate_parking_fee(start_time: datetime, end_time: datetime, db: AsyncSession):
@@ -6,6 +6,7 @@ from sqlalchemy.exc import IntegrityError
 from src.models.models import Rate
 from src.schemas.rates import RateSchema, RateUpdateSchema
 from src.conf import messages
+from src.services.reference_cache import reference_cache
 
 
 async def get_all_rates(db: AsyncSession):
@@ -37,6 +38,7 @@ async def create_rate(rate: RateSchema, db: AsyncSession):
     new_rate = Rate(rate_name=rate.rate_name, price=rate.price)
     db.add(new_rate)
     await db.commit()
+    await reference_cache.invalidate()
     await db.refresh(new_rate)
     return new_rate
 
@@ -63,6 +65,7 @@ async def update_rate(rate_id: int, rate_update: RateUpdateSchema, db: AsyncSess
     )
     await db.execute(update_stmt)
     await db.commit()
+    await reference_cache.invalidate()
 
     result = await db.execute(select(Rate).filter_by(id=rate_id))
     return result.scalar_one()
@@ -84,4 +87,5 @@ async def delete_rate(rate_id: int, db: AsyncSession):
     delete_stmt = delete(Rate).where(Rate.id == rate_id)
     await db.execute(delete_stmt)
     await db.commit()
+    await reference_cache.invalidate()
 
@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import and_
+from sqlalchemy import and_, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException, status
@@ -16,9 +17,181 @@ from src.models.models import Parking_session
 from src.conf import messages
 from src.models.models import Vehicle, Parking_session, Blacklist, Rate
 from src.schemas.session import SessionCreate, SessionClose
+from src.services.occupancy import occupancy
+from src.services.reference_cache import reference_cache
+
+
+# машина, що заїхала вперше, отримує тариф за замовчуванням (як add_vehicle_to_db_auto)
+DEFAULT_RATE_ID = 1
+
+
+def is_postgresql(db: AsyncSession) -> bool:
+    return db.bind.dialect.name == "postgresql"
+
+
+# відкриття сесії одним запитом (PostgreSQL): перевірка чорного списку,
+# додавання машини (INSERT ... ON CONFLICT DO NOTHING), перевірка відкритої
+# сесії та додавання сесії (ON CONFLICT на частковому індексі
+# uq_sessions_open_vehicle). session_id is NULL, якщо сесію не відкрито;
+# abonement - чи має машина абонемент (нова машина його не має).
+GATE_IN = text(
+    """
+    WITH blacklisted AS (
+        SELECT b.id FROM blacklists b JOIN vehicles v ON v.id = b.vehicle_id
+        WHERE v.license_plate = :license_plate
+        LIMIT 1
+    ), new_vehicle AS (
+        INSERT INTO vehicles (license_plate, created_at, rate_id)
+        SELECT :license_plate, CAST(:created_at AS timestamp), :rate_id
+        WHERE NOT EXISTS (SELECT 1 FROM blacklisted)
+        ON CONFLICT (license_plate) DO NOTHING
+        RETURNING id
+    ), vehicle AS (
+        -- нова машина не видна у vehicles в межах того ж запиту - беремо з RETURNING
+        SELECT id FROM new_vehicle
+        UNION ALL
+        SELECT id FROM vehicles WHERE license_plate = :license_plate
+    ), open_session AS (
+        SELECT id FROM sessions
+        WHERE vehicle_id IN (SELECT id FROM vehicle) AND updated_at IS NULL
+        LIMIT 1
+    ), new_session AS (
+        INSERT INTO sessions (vehicle_id, created_at)
+        SELECT id, now() FROM vehicle
+        WHERE NOT EXISTS (SELECT 1 FROM blacklisted)
+            AND NOT EXISTS (SELECT 1 FROM open_session)
+        LIMIT 1
+        ON CONFLICT (vehicle_id) WHERE updated_at IS NULL DO NOTHING
+        RETURNING id, vehicle_id, created_at
+    )
+    SELECT
+        EXISTS (SELECT 1 FROM blacklisted) AS blacklisted,
+        EXISTS (SELECT 1 FROM open_session) AS in_parking,
+        new_session.id AS session_id,
+        new_session.vehicle_id,
+        new_session.created_at,
+        EXISTS (
+            SELECT 1 FROM vehicles
+            WHERE id = new_session.vehicle_id AND ended_at IS NOT NULL
+        ) AS abonement
+    FROM (SELECT 1) AS event LEFT JOIN new_session ON true
+    """
+)
+
+# закриття сесії одним запитом (PostgreSQL): пошук машини, перевірка чорного
+# списку та закриття відкритої сесії. session_id is NULL, якщо сесію не закрито.
+GATE_OUT = text(
+    """
+    WITH vehicle AS (
+        SELECT id FROM vehicles WHERE license_plate = :license_plate
+    ), blacklisted AS (
+        SELECT id FROM blacklists
+        WHERE vehicle_id IN (SELECT id FROM vehicle)
+        LIMIT 1
+    ), closed AS (
+        UPDATE sessions SET updated_at = now()
+        WHERE vehicle_id IN (SELECT id FROM vehicle)
+            AND updated_at IS NULL
+            AND NOT EXISTS (SELECT 1 FROM blacklisted)
+        RETURNING id, vehicle_id, created_at, updated_at
+    )
+    SELECT
+        EXISTS (SELECT 1 FROM vehicle) AS vehicle_found,
+        EXISTS (SELECT 1 FROM blacklisted) AS blacklisted,
+        closed.id AS session_id,
+        closed.vehicle_id,
+        closed.created_at,
+        closed.updated_at,
+        EXISTS (
+            SELECT 1 FROM vehicles
+            WHERE id = closed.vehicle_id AND ended_at IS NOT NULL
+        ) AS abonement
+    FROM (SELECT 1) AS event LEFT JOIN closed ON true
+    ORDER BY closed.id
+    LIMIT 1
+    """
+)
 
 
 async def create_session(license_plate, db: AsyncSession):
+    """
+    Відкриття сесії для машини на в'їзді. На PostgreSQL - один запит
+    (GATE_IN) та commit, на інших СУБД - покроково.
+    """
+    if not is_postgresql(db):
+        return await create_session_stepwise(license_plate, db)
+
+    # дві одночасні події для тієї ж машини: INSERT однієї чекає на іншу і
+    # нічого не додає, а нова машина чи сесія ще не видні у знімку запиту -
+    # повтор їх бачить
+    for _ in range(2):
+        row = (
+            await db.execute(
+                GATE_IN,
+                {
+                    "license_plate": license_plate,
+                    "created_at": datetime.now(),
+                    "rate_id": DEFAULT_RATE_ID,
+                },
+            )
+        ).one()
+        await db.commit()
+        if row.blacklisted:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Entrance closed. Auto in black list",
+            )
+        if row.in_parking:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Entrance closed. Auto in the parking yet!",
+            )
+        if row.session_id is not None:
+            if not row.abonement:
+                await occupancy.changed(1)
+            return Parking_session(
+                id=row.session_id, vehicle_id=row.vehicle_id, created_at=row.created_at
+            )
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT, detail="Concurrent gate event, try again"
+    )
+
+
+async def close_session(license_plate: str, db: AsyncSession):
+    """
+    Закриття сесії для машини на виїзді. На PostgreSQL - один запит
+    (GATE_OUT) та commit, на інших СУБД - покроково.
+    """
+    if not is_postgresql(db):
+        return await close_session_stepwise(license_plate, db)
+
+    row = (await db.execute(GATE_OUT, {"license_plate": license_plate})).one()
+    await db.commit()
+    if row.blacklisted:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Exit closed. Auto in black list",
+        )
+    if not row.vehicle_found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=messages.VEHICLE_NOT_FOUND
+        )
+    if row.session_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found or already closed",
+        )
+    if not row.abonement:
+        await occupancy.changed(-1)
+    return Parking_session(
+        id=row.session_id,
+        vehicle_id=row.vehicle_id,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+async def create_session_stepwise(license_plate, db: AsyncSession):
     vehicle = await get_vehicle_in_black_list(license_plate, db)
     if vehicle:
         raise HTTPException(
@@ -38,16 +211,19 @@ async def create_session(license_plate, db: AsyncSession):
             detail="Entrance closed. Auto in the parking yet!",
         )
 
+    abonement = vehicle.ended_at is not None
     stmt = Parking_session(
         vehicle_id=vehicle.id,
     )
     db.add(stmt)
     await db.commit()
     await db.refresh(stmt)
+    if not abonement:
+        await occupancy.changed(1)
     return stmt
 
 
-async def close_session(license_plate: str, db: AsyncSession):
+async def close_session_stepwise(license_plate: str, db: AsyncSession):
     vehicle = await get_vehicle_in_black_list(license_plate, db)
     if vehicle:
         raise HTTPException(
@@ -73,14 +249,133 @@ async def close_session(license_plate: str, db: AsyncSession):
             detail="Session not found or already closed",
         )
 
+    abonement = vehicle.ended_at is not None
     # зробив час по Лондону (щоб був таки самий, як в create_session)
     session.updated_at = func.now()
     # session.updated_at = datetime.now() # видає місцевий час
     await db.commit()
     await db.refresh(session)
+    if not abonement:
+        await occupancy.changed(-1)
     return session
 
 
+async def create_sessions_batch(license_plates: list[str], db: AsyncSession):
+    """
+    Open parking sessions for many recognized plates in a single transaction.
+    Blacklist, vehicle and open-session lookups are done once for the whole batch.
+
+    :param license_plates: list[str]: recognized plate numbers
+    :param db: AsyncSession
+    :return: list of dicts (session_id or detail) in the same order
+    """
+    plates = set(license_plates)
+
+    stmt = (
+        select(Vehicle.license_plate)
+        .join(Blacklist, Blacklist.vehicle_id == Vehicle.id)
+        .where(Vehicle.license_plate.in_(plates))
+    )
+    blacklisted = set((await db.execute(stmt)).scalars().all())
+
+    stmt = select(Vehicle).where(Vehicle.license_plate.in_(plates))
+    vehicles = {v.license_plate: v for v in (await db.execute(stmt)).scalars().all()}
+
+    stmt = select(Parking_session.vehicle_id).where(
+        and_(
+            Parking_session.vehicle_id.in_([v.id for v in vehicles.values()]),
+            Parking_session.updated_at == None,
+        )
+    )
+    in_parking = set((await db.execute(stmt)).scalars().all())
+
+    results = []
+    occupied = 0
+    for license_plate in license_plates:
+        if license_plate in blacklisted:
+            results.append({"plate_number": license_plate, "detail": "Entrance closed. Auto in black list"})
+            continue
+        vehicle = vehicles.get(license_plate)
+        if vehicle is not None and vehicle.id in in_parking:
+            results.append({"plate_number": license_plate, "detail": "Entrance closed. Auto in the parking yet!"})
+            continue
+        # кожен рядок - у власній точці збереження: якщо одночасна подія на
+        # шлагбаумі вже відкрила сесію (uq_sessions_open_vehicle) чи додала
+        # машину, відкочується лише цей рядок
+        try:
+            async with db.begin_nested():
+                if vehicle is None:
+                    vehicle = Vehicle(
+                        license_plate=license_plate, created_at=datetime.now(), rate_id=DEFAULT_RATE_ID
+                    )
+                    db.add(vehicle)
+                    await db.flush()
+                new_session = Parking_session(vehicle_id=vehicle.id)
+                db.add(new_session)
+        except IntegrityError:
+            results.append({"plate_number": license_plate, "detail": "Entrance closed. Auto in the parking yet!"})
+            continue
+        vehicles[license_plate] = vehicle
+        in_parking.add(vehicle.id)
+        occupied += vehicle.ended_at is None
+        results.append({"plate_number": license_plate, "session_id": new_session.id})
+
+    await db.commit()
+    await occupancy.changed(occupied)
+    return results
+
+
+async def close_sessions_batch(license_plates: list[str], db: AsyncSession):
+    """
+    Close parking sessions for many recognized plates in a single transaction.
+
+    :param license_plates: list[str]: recognized plate numbers
+    :param db: AsyncSession
+    :return: list of dicts (session_id or detail) in the same order
+    """
+    plates = set(license_plates)
+
+    stmt = (
+        select(Vehicle.license_plate)
+        .join(Blacklist, Blacklist.vehicle_id == Vehicle.id)
+        .where(Vehicle.license_plate.in_(plates))
+    )
+    blacklisted = set((await db.execute(stmt)).scalars().all())
+
+    stmt = select(Vehicle).where(Vehicle.license_plate.in_(plates))
+    vehicles = {v.license_plate: v for v in (await db.execute(stmt)).scalars().all()}
+
+    stmt = select(Parking_session).where(
+        and_(
+            Parking_session.vehicle_id.in_([v.id for v in vehicles.values()]),
+            Parking_session.updated_at == None,
+        )
+    )
+    open_sessions = {s.vehicle_id: s for s in (await db.execute(stmt)).scalars().all()}
+
+    results = []
+    released = 0
+    for license_plate in license_plates:
+        if license_plate in blacklisted:
+            results.append({"plate_number": license_plate, "detail": "Exit closed. Auto in black list"})
+            continue
+        vehicle = vehicles.get(license_plate)
+        if vehicle is None:
+            results.append({"plate_number": license_plate, "detail": messages.VEHICLE_NOT_FOUND})
+            continue
+        session = open_sessions.pop(vehicle.id, None)
+        if session is None:
+            results.append({"plate_number": license_plate, "detail": "Session not found or already closed"})
+            continue
+        session.updated_at = func.now()
+        released += vehicle.ended_at is None
+        results.append({"plate_number": license_plate, "session_id": session.id})
+
+    await db.commit()
+    await occupancy.changed(-released)
+    return results
+
+
 def verify_image(image: bytes) -> bool:
     # Тут буде логіка перевірки зображення
     # Повертає True, якщо зображення пройшло перевірку, інакше False
@@ -103,9 +398,8 @@ async def find_vehicle_by_license_plate(license_plate: str, db: AsyncSession):
 
 
 async def find_hourly_rate_id(db: AsyncSession):
-    query = select(Rate.id).filter_by(rate_name="hourly")
-    result = await db.execute(query)
-    return result.scalar_one_or_none()
+    rate = await reference_cache.rate("hourly", db)
+    return rate.id if rate is not None else None
 
 
 async def find_open_session_by_vehicle_id(vehicle_id: int, db: AsyncSession):
@@ -115,10 +409,14 @@ async def find_open_session_by_vehicle_id(vehicle_id: int, db: AsyncSession):
 
 
 async def create_parking_session(vehicle_id: int, db: AsyncSession):
+    vehicle = await db.get(Vehicle, vehicle_id)  # зазвичай уже в сесії - без запиту
+    abonement = vehicle is not None and vehicle.ended_at is not None
     new_session = Parking_session(vehicle_id=vehicle_id)
     db.add(new_session)
     await db.commit()
     await db.refresh(new_session)
+    if not abonement:
+        await occupancy.changed(1)
     return new_session
 
 
@@ -127,9 +425,13 @@ async def close_parking_session(session_id: int, db: AsyncSession):
     query = select(Parking_session).filter_by(id=session_id)
     result = await db.execute(query)
     session = result.scalar_one()
+    vehicle = await db.get(Vehicle, session.vehicle_id)
+    abonement = vehicle is not None and vehicle.ended_at is not None
     # зробив час по Лондону (щоб був таки самий, як в create_parking_session)
     session.updated_at = func.now()
     # session.updated_at = datetime.now() # видає місцевий час
     await db.commit()
     await db.refresh(session)
+    if not abonement:
+        await occupancy.changed(-1)
     return session
@@ -4,6 +4,7 @@ from fastapi import HTTPException, status
 
 from src.conf import messages
 from src.models.models import Setting
+from src.services.reference_cache import reference_cache
 from src.schemas.settings import SettingCreateSchema, SettingUpdateSchema, SettingResponseSchema
 
 
@@ -47,6 +48,7 @@ async def create_settings(
     )
     db.add(new_setting)
     await db.commit()
+    await reference_cache.invalidate()
     await db.refresh(new_setting)
 
     return new_setting
@@ -87,6 +89,7 @@ async def update_settings(
 
     await db.execute(update_stmt)
     await db.commit()
+    await reference_cache.invalidate()
 
     result = await db.execute(select(Setting).filter_by(id=setting_id))
 
@@ -115,4 +118,5 @@ async def delete_settings(
     delete_stmt = delete(Setting).where(Setting.id == setting_id)
     await db.execute(delete_stmt)
     await db.commit()
+    await reference_cache.invalidate()
     
@@ -8,7 +8,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.conf import messages
 from src.database.db import get_db
 
-from src.models.models import Role, User, Vehicle, Blacklist, Setting, Parking_session
+from src.models.models import Role, User, Vehicle, Blacklist, Parking_session
+from src.services.occupancy import occupancy
+from src.services.reference_cache import reference_cache
 
 from src.schemas.vehicles import (
     BlacklistSchema,
@@ -295,9 +297,7 @@ async def get_vehicles_abonement(limit: int, offset: int, db: AsyncSession):
     return vehicles.scalars().all()
 
 async def get_all_vehicles_reminder(db: AsyncSession):
-    stmt = select(Setting)
-    result = await db.execute(stmt)
-    setting = result.scalar_one_or_none()
+    setting = await reference_cache.setting(db)
     days_reminder = datetime.now().date() + timedelta(days=setting.num_days_reminder)
     print(days_reminder)
     stmt = select(Vehicle).where(Vehicle.ended_at <= days_reminder)
@@ -345,7 +345,11 @@ async def get_num_vehicles_with_abonement(db: AsyncSession):
     return num_vehicles_abonement
 
 
-async def free_parking_space(db: AsyncSession):
+async def count_free_parking_space(db: AsyncSession):
+    """
+    Кількість вільних паркомісць за запитами до бази: місткість мінус
+    відкриті сесії машин без абонемента та машини з абонементом.
+    """
     stmt = (
         select(func.count())
         .select_from(Parking_session)
@@ -356,14 +360,27 @@ async def free_parking_space(db: AsyncSession):
     result: int = await db.execute(stmt)
     num_vehicles_not_abonement = result.scalar()
     print(f"{num_vehicles_not_abonement = }")
-    stmt = select(Setting)
-    result = await db.execute(stmt)
-    setting = result.scalar_one_or_none()
+    setting = await reference_cache.setting(db)
     num_vehicles_abonement = await get_num_vehicles_with_abonement(db)
     free_space = setting.capacity - num_vehicles_not_abonement - num_vehicles_abonement
     return free_space
 
 
+async def free_parking_space(db: AsyncSession):
+    """
+    Кількість вільних паркомісць з лічильника occupancy (Redis); якщо його
+    немає - рахується з бази і записується в лічильник, якщо за цей час
+    його не заповнив інший запит.
+    """
+    free_space = await occupancy.get()
+    if free_space is None:
+        free_space = await count_free_parking_space(db)
+        stored = await occupancy.fill(free_space)
+        if stored is not None:
+            free_space = stored
+    return free_space
+
+
 async def update_vehicle(
     license_plate: int, body: VehicleUpdateSchema, db: AsyncSession, current_user: User
 ):
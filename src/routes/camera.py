@@ -0,0 +1,97 @@
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+
+from src.conf.config import config
+from src.database.db import sessionmanager
+from src.models.models import Role
+from src.repository import session
+from src.services.auth import auth_service
+from src.services.plate_stream import PlateStream
+from src.services.recognition import RecognitionTimeout, recognition_executor
+
+router = APIRouter(prefix="/camera", tags=["camera"])
+
+DIRECTIONS = ("in", "out")
+
+
+@router.websocket("/stream/{direction}")
+async def camera_stream(
+    websocket: WebSocket,
+    direction: str,
+    token: str,
+):
+    """
+    Continuous frame stream from a gate camera.
+
+    The camera sends JPEG frames as binary messages. Every (CAMERA_FRAME_SKIP + 1)-th
+    frame goes to the plate cascade; character classification and OCR run only when
+    the plate region is stable for CAMERA_STABLE_FRAMES detections. A confident
+    reading opens (direction "in") or closes (direction "out") the parking session
+    and is sent back as a JSON event.
+
+    The stream holds no database session: one is opened to authenticate and
+    one per gate event, so connected cameras do not keep pool connections.
+    """
+    if direction not in DIRECTIONS:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        async with sessionmanager.session() as db:
+            user = await auth_service.get_current_user(token, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if user.role != Role.admin:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    stream = PlateStream(
+        frame_skip=config.CAMERA_FRAME_SKIP,
+        stable_frames=config.CAMERA_STABLE_FRAMES,
+        lost_frames=config.CAMERA_LOST_FRAMES,
+    )
+
+    try:
+        while True:
+            frame = await websocket.receive_bytes()
+            if not stream.should_detect():
+                continue
+
+            rect = await recognition_executor.detect(frame)
+            stream.update(rect)
+            if not stream.needs_recognition():
+                continue
+
+            try:
+                number, recognize, confidence = await recognition_executor.recognize(frame)
+            except RecognitionTimeout:
+                stream.retry()
+                continue
+            if not recognize:
+                stream.retry()
+                continue
+
+            stream.reported = number
+            try:
+                async with sessionmanager.session() as db:
+                    if direction == "in":
+                        result = await session.create_session(number, db)
+                    else:
+                        result = await session.close_session(number, db)
+                    session_id = result.id
+            except HTTPException as e:
+                await websocket.send_json(
+                    {"event": "rejected", "plate_number": number, "detail": e.detail}
+                )
+                continue
+
+            await websocket.send_json(
+                {
+                    "event": direction,
+                    "session_id": session_id,
+                    "plate_number": number,
+                    "confidence": confidence,
+                }
+            )
+    except WebSocketDisconnect:
+        pass
@@ -1,5 +1,10 @@
+import asyncio
+import io
 import re
-from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, APIRouter, status
+import zipfile
+import zlib
+
+from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, APIRouter, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repository import session
@@ -7,7 +12,9 @@ from src.schemas.session import SessionCreate, SessionClose
 from src.services.roles import RoleAccess
 from src.models.models import Role, User
 from src.database.db import get_db
-from src.services.use_model import processing
+from src.conf.config import config
+from src.services.recognition import recognition_executor
+from src.services.plate_tracker import dhash, plate_tracker
 
 from src.repository import vehicles as repositories_vehicles
 from src.services.auth import auth_service
@@ -15,21 +22,162 @@ from src.services.auth import auth_service
 router = APIRouter(prefix="/session", tags=["session"])
 access_to_route_all = RoleAccess([Role.admin])
 
-LICENSE_PLATE_REGEX = re.compile(r"^[A-Za-zА-Яа-я]{2}\d{4}[A-Za-zА-Яа-я]{2}$")
+# AA1234BB або номер зразка 1995 року 12345AB (як plate_format.TEMPLATES)
+LICENSE_PLATE_REGEX = re.compile(
+    r"^(?:[A-Za-zА-Яа-я]{2}\d{4}|\d{5})[A-Za-zА-Яа-я]{2}$"
+)
+# ідентифікатор шлагбаума (камери) для повторних подій
+GATE_PATTERN = r"^[\w.-]+$"
 
 
-@router.post("/in", dependencies=[Depends(access_to_route_all)])
-async def in_session(image: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+async def read_batch_images(images: list[UploadFile]) -> tuple[list[str], list[bytes]]:
+    """
+    Read uploaded images for a batch request. A zip archive is unpacked
+    into its files (in name order). The number of images and their sizes
+    are checked before anything is decompressed.
+    """
+    too_many = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Too many images in batch (max {config.RECOGNITION_BATCH_MAX})",
+    )
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=(
+            f"Images too large (max {config.RECOGNITION_IMAGE_MAX_BYTES} bytes per image, "
+            f"{config.RECOGNITION_BATCH_MAX_BYTES} per batch)"
+        ),
+    )
+    names, photos = [], []
+    total = 0
+    for image in images:
+        content = await image.read()
+        if zipfile.is_zipfile(io.BytesIO(content)):
+            try:
+                with zipfile.ZipFile(io.BytesIO(content)) as archive:
+                    members = [info for info in archive.infolist() if not info.is_dir()]
+                    if len(photos) + len(members) > config.RECOGNITION_BATCH_MAX:
+                        raise too_many
+                    # file_size із заголовка: zipfile не розпаковує більше за нього
+                    sizes = [info.file_size for info in members]
+                    if max(sizes, default=0) > config.RECOGNITION_IMAGE_MAX_BYTES:
+                        raise too_large
+                    total += sum(sizes)
+                    if total > config.RECOGNITION_BATCH_MAX_BYTES:
+                        raise too_large
+                    for info in sorted(members, key=lambda i: i.filename):
+                        names.append(info.filename)
+                        photos.append(archive.read(info))
+            except (zipfile.BadZipFile, zlib.error, EOFError) as err:
+                # пошкоджений архів або член, що не збігається із заголовком (CRC)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid zip archive {image.filename}: {err}",
+                ) from err
+        else:
+            if len(photos) + 1 > config.RECOGNITION_BATCH_MAX:
+                raise too_many
+            total += len(content)
+            if len(content) > config.RECOGNITION_IMAGE_MAX_BYTES:
+                raise too_large
+            if total > config.RECOGNITION_BATCH_MAX_BYTES:
+                raise too_large
+            names.append(image.filename)
+            photos.append(content)
+
+    if not photos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No images in request"
+        )
+    return names, photos
+
+
+def merge_batch_results(names, recognized, processed) -> list[dict]:
+    """
+    Combine recognition results with per-plate session results
+    (processed contains entries only for recognized images).
+    """
+    processed = iter(processed)
+    results = []
+    for name, (number, recognize, confidence) in zip(names, recognized):
+        if not recognize:
+            results.append(
+                {
+                    "image": name,
+                    "plate_number": number,
+                    "confidence": confidence,
+                    "detail": f"Image verification failed - {number}",
+                }
+            )
+        else:
+            results.append({"image": name, "confidence": confidence, **next(processed)})
+    return results
+
+
+async def gate_event(direction: str, image: UploadFile, gate: str | None, action, db):
+    """
+    Розпізнавання номера та відкриття/закриття сесії (action).
+
+    Якщо передано gate, повторна подія на тому ж шлагбаумі в межах
+    GATE_REPEAT_WINDOW отримує результат першої: майже той самий кадр -
+    без розпізнавання, той самий номер - без запитів до бази.
+    """
     image_bytes = await image.read()
 
-    number, recognize = processing(image_bytes, echo=False, log_on=False)
+    key, image_hash = None, None
+    if gate:
+        key = f"{direction}:{gate}"
+        image_hash = await asyncio.to_thread(dhash, image_bytes)
+        repeated = plate_tracker.match_frame(key, image_hash)
+        if repeated is not None:
+            return repeated.replay()
+
+    (number, recognize, confidence), trace = await recognition_executor.recognize_traced(
+        image_bytes
+    )
     if not recognize:
         raise HTTPException(
             status_code=406, detail=f"Image verification failed - {number}"
         )
 
-    result = await session.create_session(number, db)
-    return {"session_id": result.id, "plate_number": number}
+    if key is not None:
+        repeated = plate_tracker.match_plate(key, number)
+        if repeated is not None:
+            return repeated.replay()
+
+    try:
+        result = await action(number, db)
+    except HTTPException as err:
+        if key is not None:
+            plate_tracker.remember(key, number, image_hash, error=err)
+        raise
+
+    response = {"session_id": result.id, "plate_number": number, "confidence": confidence}
+    if key is not None:
+        plate_tracker.remember(key, number, image_hash, response=response)
+    if config.RECOGNITION_DEBUG:
+        response = {**response, "timings": trace}
+    return response
+
+
+@router.post("/in", dependencies=[Depends(access_to_route_all)])
+async def in_session(
+    image: UploadFile = File(...),
+    gate: str | None = Query(None, max_length=32, pattern=GATE_PATTERN),
+    db: AsyncSession = Depends(get_db),
+):
+    return await gate_event("in", image, gate, session.create_session, db)
+
+
+@router.post("/in/batch", dependencies=[Depends(access_to_route_all)])
+async def in_session_batch(
+    images: list[UploadFile] = File(...), db: AsyncSession = Depends(get_db)
+):
+    names, photos = await read_batch_images(images)
+    recognized = await recognition_executor.recognize_batch(photos)
+
+    plates = [number for number, recognize, _ in recognized if recognize]
+    processed = await session.create_sessions_batch(plates, db) if plates else []
+    return {"results": merge_batch_results(names, recognized, processed)}
 
 
 #  Manual_in
@@ -42,7 +190,7 @@ async def manual_in(
     if not LICENSE_PLATE_REGEX.match(license_plate):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid license plate format. Must be 2 letters, 4 digits, 2 letters.",
+            detail="Invalid license plate format. Must be 2 letters, 4 digits, 2 letters or 5 digits, 2 letters.",
         )
 
     blacklist_entry = await session.find_vehicle_in_blacklist(license_plate, db)
@@ -79,17 +227,23 @@ async def manual_in(
 
 @router.post("/out", dependencies=[Depends(access_to_route_all)])
 async def out_session(
-    image: UploadFile = File(...), db: AsyncSession = Depends(get_db)
+    image: UploadFile = File(...),
+    gate: str | None = Query(None, max_length=32, pattern=GATE_PATTERN),
+    db: AsyncSession = Depends(get_db),
 ):
-    image_bytes = await image.read()
-    number, recognize = processing(image_bytes, echo=False, log_on=False)
-    if not recognize:
-        raise HTTPException(
-            status_code=406, detail=f"Image verification failed - {number}"
-        )
+    return await gate_event("out", image, gate, session.close_session, db)
+
+
+@router.post("/out/batch", dependencies=[Depends(access_to_route_all)])
+async def out_session_batch(
+    images: list[UploadFile] = File(...), db: AsyncSession = Depends(get_db)
+):
+    names, photos = await read_batch_images(images)
+    recognized = await recognition_executor.recognize_batch(photos)
 
-    result = await session.close_session(number, db)
-    return {"session_id": result.id, "plate_number": number}
+    plates = [number for number, recognize, _ in recognized if recognize]
+    processed = await session.close_sessions_batch(plates, db) if plates else []
+    return {"results": merge_batch_results(names, recognized, processed)}
 
 
 @router.post("/manual_out")
@@ -101,7 +255,7 @@ async def manual_out(
     if not LICENSE_PLATE_REGEX.match(license_plate):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid license plate format. Must be 2 letters, 4 digits, 2 letters.",
+            detail="Invalid license plate format. Must be 2 letters, 4 digits, 2 letters or 5 digits, 2 letters.",
         )
 
     blacklist_entry = await session.find_vehicle_in_blacklist(license_plate, db)
@@ -1,6 +1,6 @@
 import os
 from datetime import datetime
-from starlette.responses import FileResponse
+from starlette.responses import FileResponse, StreamingResponse
 from fastapi import (
     APIRouter,
     HTTPException,
@@ -20,7 +20,7 @@ import pandas as pd
 from sqlalchemy import select
 from src.models.models import Parking_session, Payment, Vehicle, User
 
-from src.database.db import get_db
+from src.database.db import get_db, sessionmanager
 from src.models.models import User, Role
 
 from src.repository.utilities import get_parking_data
@@ -34,6 +34,7 @@ from src.services.roles import RoleAccess
 from src.repository import vehicles as repositories_vehicles
 
 from src.services.email import send_email_by_license_plate, send_email_info
+from src.services.occupancy import occupancy
 
 
 router = APIRouter(prefix="/utilities", tags=["utilities"])
@@ -136,6 +137,45 @@ async def free_parking_places(
     return f"Кількість вільних паркомісць {num_free}"
 
 
+@router.get("/free_parking_places/stream")
+async def free_parking_places_stream(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Кількість вільних паркомісць для табло (server-sent events): поточне
+    значення одразу, далі - кожна зміна лічильника. Якщо змін немає
+    OCCUPANCY_STREAM_INTERVAL секунд, надсилається keep-alive; без Redis
+    значення в цей момент перечитується з бази.
+    """
+    num_free = await repositories_vehicles.free_parking_space(db)
+    # з'єднання з пулу не тримається весь час, поки табло підключене
+    await db.close()
+
+    async def events():
+        last = num_free
+        yield f"data: {last}\n\n"
+        async for value in occupancy.updates(config.OCCUPANCY_STREAM_INTERVAL):
+            if await request.is_disconnected():
+                break
+            if value is None and occupancy.redis is None:
+                async with sessionmanager.session() as session:
+                    value = await repositories_vehicles.free_parking_space(session)
+                if value == last:
+                    value = None
+            if value is None:
+                yield ": keep-alive\n\n"
+                continue
+            last = value
+            yield f"data: {value}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/export", response_class=FileResponse)
 async def export_parking_data(
     start_date: datetime = Query(
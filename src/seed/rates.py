@@ -4,6 +4,7 @@ from sqlalchemy import select, delete
 
 from src.database.db import get_db
 from src.models.models import Rate
+from src.services.reference_cache import reference_cache
 
 
 async def seed_rates(base: int = 10, db: AsyncSession = Depends(get_db)):
@@ -33,3 +34,5 @@ async def seed_rates(base: int = 10, db: AsyncSession = Depends(get_db)):
         db.add(new_rate)
         await db.commit()
         await db.refresh(new_rate)
+
+    await reference_cache.invalidate()
@@ -4,6 +4,7 @@ from sqlalchemy import select, delete
 
 from src.database.db import get_db
 from src.models.models import Setting
+from src.services.reference_cache import reference_cache
 
 
 async def seed_settings(db: AsyncSession = Depends(get_db)):
@@ -25,3 +26,4 @@ async def seed_settings(db: AsyncSession = Depends(get_db)):
     db.add(new_settings)
     await db.commit()
     await db.refresh(new_settings)
+    await reference_cache.invalidate()
@@ -0,0 +1,89 @@
+import threading
+from collections import deque
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+
+class FrameRef(NamedTuple):
+    """кадр у слоті кільця - між процесами передається лише це"""
+
+    name: str
+    slot: int
+    offset: int
+    size: int
+
+
+class FrameRing:
+    """
+    Кільцевий буфер кадрів у спільній пам'яті (multiprocessing.shared_memory):
+    slots попередньо виділених слотів по slot_size байтів.
+
+    Процес API копіює кадр у вільний слот (put), а воркерам передає лише
+    FrameRef; воркер читає кадр зі спільної пам'яті без копіювання
+    (frame_view). Слот звільняється (release), коли розпізнавання завершено.
+    Якщо вільних слотів немає або кадр більший за слот, put повертає None -
+    тоді кадр передається звичайним pickle.
+    """
+
+    def __init__(self, slots: int, slot_size: int):
+        self.slots = slots
+        self.slot_size = slot_size
+        self._shm: shared_memory.SharedMemory | None = None
+        self._free: deque[int] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str | None:
+        return self._shm.name if self._shm is not None else None
+
+    @property
+    def free_slots(self) -> int:
+        return len(self._free)
+
+    def open(self):
+        if self._shm is not None or self.slots <= 0:
+            return
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_size)
+        self._free = deque(range(self.slots))
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+        self._free.clear()
+
+    def put(self, frame: bytes) -> FrameRef | None:
+        """копіює кадр у наступний вільний слот"""
+        if self._shm is None or len(frame) > self.slot_size:
+            return None
+        with self._lock:
+            if not self._free:
+                return None
+            slot = self._free.popleft()
+        offset = slot * self.slot_size
+        self._shm.buf[offset : offset + len(frame)] = frame
+        return FrameRef(self._shm.name, slot, offset, len(frame))
+
+    def release(self, ref: FrameRef):
+        if ref.name != self.name:
+            return  # слот кільця, яке вже закрито
+        with self._lock:
+            self._free.append(ref.slot)
+
+
+# спільна пам'ять, до якої вже під'єднано цей процес (воркер), за назвою
+_attached: dict[str, shared_memory.SharedMemory] = {}
+
+
+def frame_view(ref: FrameRef) -> memoryview:
+    """
+    Кадр зі слоту кільця у процесі-воркері - memoryview спільної пам'яті,
+    без копіювання (np.frombuffer / cv2.imdecode читають його напряму).
+    Дійсний, доки процес API не звільнить слот.
+    """
+    shm = _attached.get(ref.name)
+    if shm is None:
+        shm = _attached[ref.name] = shared_memory.SharedMemory(name=ref.name)
+    return shm.buf[ref.offset : ref.offset + ref.size]
@@ -0,0 +1,115 @@
+import threading
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+MODEL_PATHS = {
+    "keras": "src/models/model_ua_license_plate.keras",
+    "onnx": "src/models/model_ua_license_plate.onnx",
+    "tflite": "src/models/model_ua_license_plate.tflite",
+}
+
+
+class InferenceBackend(ABC):
+    """
+    Бекенд класифікатора символів: приймає пакет (N, 28, 28, 3)
+    і повертає ймовірності класів (N, 36).
+    """
+
+    name = ""
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+
+    @abstractmethod
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        ...
+
+
+class KerasBackend(InferenceBackend):
+    """повний TensorFlow/Keras"""
+
+    name = "keras"
+
+    def __init__(self, model_path: str):
+        super().__init__(model_path)
+        from keras.models import load_model
+
+        self.model = load_model(model_path, compile=False)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.predict_on_batch(batch))
+
+
+class OnnxBackend(InferenceBackend):
+    """onnxruntime на CPU (pip install onnxruntime)"""
+
+    name = "onnx"
+
+    def __init__(self, model_path: str):
+        super().__init__(model_path)
+        import onnxruntime
+
+        self.session = onnxruntime.InferenceSession(
+            model_path, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        batch = batch.astype(np.float32, copy=False)
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class TFLiteBackend(InferenceBackend):
+    """
+    TFLite interpreter на CPU: tflite-runtime, якщо встановлено,
+    інакше tensorflow.lite. Інтерпретатор не потокобезпечний - виклики
+    серіалізуються.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_path: str):
+        super().__init__(model_path)
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        self.interpreter = Interpreter(model_path=model_path)
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self._batch_size = None
+        self._lock = threading.Lock()
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        batch = batch.astype(np.float32, copy=False)
+        with self._lock:
+            if self._batch_size != len(batch):
+                self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+                self.interpreter.allocate_tensors()
+                self._batch_size = len(batch)
+            self.interpreter.set_tensor(self.input_index, batch)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index).copy()
+
+
+BACKENDS = {
+    backend.name: backend for backend in (KerasBackend, OnnxBackend, TFLiteBackend)
+}
+
+
+def load_backend(name: str, model_path: str | None = None) -> InferenceBackend:
+    """
+    Створює бекенд класифікатора за назвою ("keras", "onnx", "tflite").
+
+    :param name: str: назва бекенду
+    :param model_path: str: шлях до моделі (за замовчуванням - MODEL_PATHS[name])
+    :return: InferenceBackend
+    """
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown inference backend '{name}', expected one of {sorted(BACKENDS)}"
+        )
+    return BACKENDS[name](model_path or MODEL_PATHS[name])
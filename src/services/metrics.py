@@ -0,0 +1,36 @@
+from bisect import bisect_left
+
+
+class Histogram:
+    """гістограма з фіксованими кошиками у форматі Prometheus"""
+
+    def __init__(self, name: str, help_: str, buckets: tuple, label: str | None = None):
+        self.name = name
+        self.help = help_
+        self.buckets = buckets
+        self.label = label
+        self._series: dict[str, list] = {}
+
+    def observe(self, value: float, label_value: str = ""):
+        series = self._series.setdefault(label_value, [[0] * len(self.buckets), 0, 0.0])
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += 1
+        series[2] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_value, (counts, count, total) in sorted(self._series.items()):
+            labels = f'{self.label}="{label_value}"' if self.label else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                sep = "," if labels else ""
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+            sep = "," if labels else ""
+            lines.append(f'{self.name}_bucket{{{labels}{sep}le="+Inf"}} {count}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+
+from redis.exceptions import RedisError, WatchError
+
+logger = logging.getLogger(__name__)
+
+# зменшує лічильник, лише якщо він уже є (інакше його заново порахує база),
+# і одразу публікує нове значення - один атомарний виклик
+_CHANGE = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+local free = redis.call('DECRBY', KEYS[1], ARGV[1])
+redis.call('PUBLISH', KEYS[2], free)
+return free
+"""
+
+# перше заповнення лічильника: записує значення, лише якщо ключа ще немає
+# (SET NX), і публікує його; інакше повертає вже наявне значення
+_FILL = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX') then
+    redis.call('PUBLISH', KEYS[2], ARGV[1])
+    return tonumber(ARGV[1])
+end
+return tonumber(redis.call('GET', KEYS[1]))
+"""
+
+
+class OccupancyCounter:
+    """
+    Кількість вільних паркомісць у Redis, спільна для всіх воркерів API.
+
+    Відкриття та закриття сесії на шлагбаумі змінюють лічильник атомарно
+    (changed), тож free_parking_space читає одне значення замість трьох
+    запитів до бази. Кожна зміна публікується в канал channel - з нього
+    табло отримують значення через server-sent events (updates).
+
+    Зміни, яких лічильник не бачить (абонемент, місткість у налаштуваннях,
+    seed), виправляє періодичне звірення з базою (keep_reconciled). Без
+    Redis або без ключа значення рахується з бази. Запис значення з бази
+    не затирає одночасних змін з шлагбаумів: перше заповнення - SET NX
+    (fill), звірення - WATCH/MULTI (reconcile).
+    """
+
+    def __init__(self, redis=None, key="parking:free", channel="parking:free"):
+        self.redis = redis
+        self.key = key
+        self.channel = channel
+        self._change = None
+        self._fill = None
+
+    async def get(self) -> int | None:
+        if self.redis is None:
+            return None
+        try:
+            free = await self.redis.get(self.key)
+        except RedisError:
+            return None
+        return int(free) if free is not None else None
+
+    async def fill(self, free: int) -> int | None:
+        """
+        Записує значення, пораховане з бази, якщо лічильника ще немає.
+        Повертає значення лічильника (записане чи наявне) або None без Redis.
+        """
+        if self.redis is None:
+            return None
+        try:
+            if self._fill is None:
+                self._fill = self.redis.register_script(_FILL)
+            return await self._fill(keys=[self.key, self.channel], args=[free])
+        except RedisError as e:
+            logger.warning("occupancy counter not stored: %s", e)
+            return None
+
+    async def reconcile(self, count) -> bool:
+        """
+        Перезаписує лічильник значенням з бази (count() - корутина) і
+        публікує його, якщо воно змінилося. Ключ під WATCH, поки рахує
+        база: якщо шлагбаум змінив лічильник за цей час, запис
+        скасовується (False), щоб зміна не загубилася, - значення виправить
+        наступне звірення.
+        """
+        if self.redis is None:
+            return False
+        async with self.redis.pipeline(transaction=True) as pipe:
+            await pipe.watch(self.key)
+            previous = await pipe.get(self.key)
+            free = await count()
+            pipe.multi()
+            pipe.set(self.key, free)
+            if previous is None or int(previous) != free:
+                pipe.publish(self.channel, free)
+            try:
+                await pipe.execute()
+            except WatchError:
+                return False
+        return True
+
+    async def changed(self, occupied: int):
+        """occupied машин заїхало (від'ємне - виїхало) без абонемента"""
+        if self.redis is None or not occupied:
+            return
+        try:
+            if self._change is None:
+                self._change = self.redis.register_script(_CHANGE)
+            await self._change(keys=[self.key, self.channel], args=[occupied])
+        except RedisError as e:
+            # лічильник виправить наступне звірення з базою
+            logger.warning("occupancy counter not changed: %s", e)
+
+    async def updates(self, interval: float):
+        """
+        Нові значення з каналу. Якщо за interval секунд змін не було (або
+        Redis немає), повертає None - для keep-alive чи читання з бази.
+        """
+        if self.redis is None:
+            while True:
+                await asyncio.sleep(interval)
+                yield None
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=interval
+                )
+                yield int(message["data"]) if message is not None else None
+        finally:
+            await pubsub.aclose()
+
+    async def keep_reconciled(self, count, session_factory, interval: float):
+        """
+        Звіряє лічильник з базою одразу та кожні interval секунд.
+        count(db) - кількість вільних місць за запитом до бази.
+        Без Redis звіряти нічого - значення й так рахується з бази.
+        """
+        if self.redis is None:
+            logger.info("occupancy reconciliation disabled: no redis")
+            return
+        while True:
+            try:
+                async with session_factory() as db:
+                    if not await self.reconcile(lambda: count(db)):
+                        logger.info("occupancy reconciliation skipped: counter changed")
+            except Exception as e:
+                logger.warning("occupancy reconciliation failed: %s", e)
+            await asyncio.sleep(interval)
+
+
+occupancy = OccupancyCounter()
@@ -0,0 +1,178 @@
+import re
+
+from src.conf.constants import NOT_NUMBER
+
+# позиційна корекція: символи, які OCR/модель плутає, у позиції літери та цифри
+LETTERS = str.maketrans(
+    {"1": "I", "i": "I", "|": "I", "0": "O", "7": "Z", "8": "B", "5": "B"}
+)
+DIGITS = str.maketrans(
+    {
+        "I": "1",
+        "|": "1",
+        "O": "0",
+        "J": "3",
+        "G": "6",
+        "A": "6",
+        "Z": "7",
+        "B": "8",
+        "Y": "9",
+        "S": "9",
+    }
+)
+# токен OCR без переносів рядка та пробілів
+TOKEN_JUNK = str.maketrans("", "", "\n ")
+
+PLATE_CHARS = re.compile(r"^[A-Z0-9]+$")
+ROW_OF_FOUR = re.compile(r"^[A-Z0-9]{4}$")
+DIGITS_ROW = re.compile(r"^\d{4}$")
+LETTERS_ROW = re.compile(r"^[A-Z]{4}$")
+
+NOT_NUMBERS = frozenset(NOT_NUMBER)
+NOT_RECOGNIZED = "NOT RECOGNIZED"
+
+_MASK_PATTERNS = {"L": r"[A-Z]", "D": r"\d"}
+_MASK_TABLES = {"L": LETTERS, "D": DIGITS}
+
+
+class PlateTemplate:
+    """
+    Формат номерного знака, заданий маскою: L - літера, D - цифра
+    (наприклад "LLDDDDLL" для AA1234BB).
+
+    Регулярний вираз для перевірки та таблиці корекції для кожної позиції
+    будуються один раз при створенні шаблону.
+    """
+
+    def __init__(self, name: str, mask: str):
+        self.name = name
+        self.mask = mask
+        self.pattern = re.compile(
+            "^" + "".join(_MASK_PATTERNS[kind] for kind in mask) + "$"
+        )
+        # відрізки маски з однаковим типом позиції: "LLDDDDLL" -> (0, 2), (2, 6), (6, 8)
+        self._runs = [
+            (match.start(), match.end(), _MASK_TABLES[match.group()[0]])
+            for match in re.finditer(r"L+|D+", mask)
+        ]
+
+    def __len__(self):
+        return len(self.mask)
+
+    def __repr__(self):
+        return f"PlateTemplate({self.name!r}, {self.mask!r})"
+
+    def validate(self, text: str) -> bool:
+        return self.pattern.match(text) is not None
+
+    def correct(self, text: str) -> str:
+        """
+        Позиційна корекція номера довжини шаблону: у позиціях літер цифри
+        замінюються схожими літерами і навпаки. Ризиковано: наприклад
+        "00OOOO00" буде перетворено на "OO0000OO" для "LLDDDDLL".
+        """
+        corrected = "".join(
+            text[start:end].translate(table) for start, end, table in self._runs
+        )
+        return corrected + text[len(self.mask) :]
+
+
+# сучасний український номер (з 2004 року): AA1234BB
+UA = PlateTemplate("ua", "LLDDDDLL")
+# номер зразка 1995 року: 12345AB. Приймається лише без корекції: інакше
+# сучасний номер з пропущеною першою літерою (A1234BB -> 61234BB) проходив би
+# перевірку без OCR-резерву
+UA_1995 = PlateTemplate("ua_1995", "DDDDDLL")
+
+TEMPLATES = {template.name: template for template in (UA, UA_1995)}
+
+
+def correction_ua_number(text: str) -> str:
+    """
+    позиційна обробка ["1", "0", "7", '8'] <-> ["I", "O", "Z", 'B']
+    для номера з 8 символів (шаблон UA)
+    """
+    return UA.correct(text)
+
+
+def validate_ukraine_plate(text):
+    """
+    Validate Ukrainian plate format (any of TEMPLATES)
+    """
+    return find_template(text) is not None
+
+
+def find_template(text: str, templates=TEMPLATES.values()) -> PlateTemplate | None:
+    """
+    Шаблон, якому відповідає номер (без корекції), або None.
+    """
+    for template in templates:
+        if template.validate(text):
+            return template
+    return None
+
+
+def clean_token(text: str) -> str:
+    """токен OCR без пробілів та переносів рядка"""
+    return text.strip().translate(TOKEN_JUNK)
+
+
+def is_top_row(text: str) -> bool:
+    """чи може токен бути верхнім рядком двохрядкового номера (4 символи)"""
+    return ROW_OF_FOUR.match(text) is not None
+
+
+def top_row_letters(text: str) -> str:
+    """верхній рядок двохрядкового номера - лише літери"""
+    return text.translate(LETTERS)
+
+
+def merge_rows(top: str, bottom: str) -> str | None:
+    """
+    Двохрядковий номер: верхній рядок - 4 літери, нижній - 4 цифри.
+    AB + 1234 + CD з рядків "ABCD" та "1234"; None, якщо рядки не підходять.
+    """
+    if DIGITS_ROW.match(bottom) and LETTERS_ROW.match(top):
+        return top[:2] + bottom + top[2:]
+    return None
+
+
+def normalize_number(plate_number_: str) -> str:
+    """
+    Позиційна корекція для номерів з 8 символів (шаблон UA). Номери інших
+    шаблонів не коригуються - їх приймає лише точний збіг з шаблоном.
+    """
+    if len(plate_number_) == len(UA):
+        return UA.correct(plate_number_)
+    return plate_number_
+
+
+def is_valid_reading(plate_number_: str) -> bool:
+    """чи проходить прочитаний номер (після корекції) перевірку формату"""
+    return plate_number_ != NOT_RECOGNIZED and validate_ukraine_plate(
+        normalize_number(plate_number_)
+    )
+
+
+def needs_ocr(plate_number_: str, confidence: float, threshold: float) -> bool:
+    """
+    Чи потрібен OCR-резерв: номер від моделі не пройшов перевірку формату
+    або якийсь символ розпізнано з ймовірністю нижче threshold.
+    """
+    return not is_valid_reading(plate_number_) or confidence < threshold
+
+
+def choose_reading(
+    plate_number_: str, confidence: float, ocr_number: str, ocr_confidence: float
+) -> tuple[str, float]:
+    """
+    Краще з прочитань моделі та OCR: OCR перемагає, якщо модель номер не
+    знайшла, або якщо номер OCR правильного формату, а номер моделі -
+    ні чи менш впевнений.
+    """
+    if plate_number_ == NOT_RECOGNIZED or (
+        is_valid_reading(ocr_number)
+        and (not is_valid_reading(plate_number_) or ocr_confidence > confidence)
+    ):
+        return ocr_number, ocr_confidence
+    return plate_number_, confidence
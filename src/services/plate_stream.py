@@ -0,0 +1,72 @@
+def rect_iou(a: tuple, b: tuple) -> float:
+    """Intersection over union of two (x, y, w, h) rectangles."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    inter_h = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = inter_w * inter_h
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+class PlateStream:
+    """
+    State of one camera stream.
+
+    Decides which frames go to the cascade (frame skipping), when the plate
+    region is stable enough to run the expensive classification and OCR, and
+    suppresses repeated events while the same car stays in front of the camera.
+    """
+
+    def __init__(
+        self,
+        frame_skip: int,
+        stable_frames: int,
+        lost_frames: int,
+        iou_threshold: float = 0.6,
+    ):
+        self.frame_skip = frame_skip
+        self.stable_frames = stable_frames
+        self.lost_frames = lost_frames
+        self.iou_threshold = iou_threshold
+        self.frame_no = 0
+        self._last_rect = None
+        self._stable = 0
+        self._missed = 0
+        self.reported = None  # номер, про який вже надіслано подію
+
+    def should_detect(self) -> bool:
+        """Count the incoming frame; True if it has to go to the cascade."""
+        self.frame_no += 1
+        return (self.frame_no - 1) % (self.frame_skip + 1) == 0
+
+    def update(self, rect: tuple | None) -> bool:
+        """
+        Register the detection result for a frame.
+
+        :return: True if the plate region has been stable for stable_frames detections
+        """
+        if rect is None:
+            self._missed += 1
+            self._stable = 0
+            self._last_rect = None
+            if self._missed >= self.lost_frames:
+                # машина поїхала - наступний номер буде новою подією
+                self.reported = None
+            return False
+
+        self._missed = 0
+        if self._last_rect is not None and rect_iou(rect, self._last_rect) >= self.iou_threshold:
+            self._stable += 1
+        else:
+            self._stable = 1
+        self._last_rect = rect
+        return self._stable >= self.stable_frames
+
+    def needs_recognition(self) -> bool:
+        """A plate is stable and no event has been sent for this car yet."""
+        return self._stable >= self.stable_frames and self.reported is None
+
+    def retry(self):
+        """Recognition was not confident - wait for another stable run of frames."""
+        self._stable = 0
@@ -0,0 +1,133 @@
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+from fastapi import HTTPException
+
+from src.conf.config import config
+
+HASH_SIZE = 8
+
+
+def dhash(photo: bytes) -> int | None:
+    """
+    Перцептивний хеш кадру (dHash, 64 біти): зменшений сірий кадр 9x8,
+    кожен біт - чи світліший піксель за сусіда ліворуч. Майже однакові
+    кадри з камери мають хеші з малою відстанню Геммінга.
+
+    :param photo: bytes: вміст зображення
+    :return: int або None, якщо зображення не вдалося декодувати
+    """
+    gray = cv2.imdecode(np.frombuffer(photo, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if gray is None:
+        return None
+    small = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class GateEvent:
+    """результат події на шлагбаумі: відповідь або помилка (HTTPException)"""
+
+    def __init__(self, plate: str, image_hash: int | None, response=None, error=None):
+        self.plate = plate
+        self.image_hash = image_hash
+        self.response = response
+        self.error = error
+        self.expires_at = 0.0
+
+    def replay(self) -> dict:
+        """повторює результат першої події (помилку - тим самим винятком)"""
+        if self.error is not None:
+            raise HTTPException(status_code=self.error.status_code, detail=self.error.detail)
+        return {**self.response, "repeated": True}
+
+
+class PlateTracker:
+    """
+    Недавні події на кожному шлагбаумі: розпізнаний номер, хеш кадру та
+    результат. Та сама машина часто надсилає кілька кадрів поспіль - повтор
+    у межах вікна window (секунди) від першої події впізнається за хешем
+    кадру (без розпізнавання) або за номером (без запитів до бази) і
+    отримує результат першої події. Повтори вікно не продовжують.
+
+    Помилки, після яких варто повторити спробу (409 - одночасна подія,
+    5xx), не запам'ятовуються. Шлагбаумів не більше max_gates: новий
+    витісняє ті, де всі події застаріли, а далі - найдавніший.
+    """
+
+    def __init__(
+        self, window: float, max_distance: int, max_events: int = 32, max_gates: int = 64
+    ):
+        self.window = window
+        self.max_distance = max_distance
+        self.max_events = max_events
+        self.max_gates = max_gates
+        self._gates: dict[str, deque[GateEvent]] = {}
+
+    def _events(self, gate: str) -> deque[GateEvent]:
+        events = self._gates.get(gate)
+        if events is None:
+            return deque()
+        now = time.monotonic()
+        while events and events[0].expires_at <= now:
+            events.popleft()
+        return events
+
+    def _gate(self, gate: str) -> deque[GateEvent]:
+        """черга шлагбаума для нової події; шлагбаум стає наймолодшим"""
+        events = self._gates.pop(gate, None)
+        if events is None:
+            events = deque(maxlen=self.max_events)
+            if len(self._gates) >= self.max_gates:
+                now = time.monotonic()
+                stale = [g for g, e in self._gates.items() if not e or e[-1].expires_at <= now]
+                for name in stale:
+                    del self._gates[name]
+            while len(self._gates) >= self.max_gates:
+                del self._gates[next(iter(self._gates))]
+        self._gates[gate] = events
+        return events
+
+    def match_frame(self, gate: str, image_hash: int | None) -> GateEvent | None:
+        """подія з майже тим самим кадром на цьому шлагбаумі"""
+        if image_hash is None or self.window <= 0:
+            return None
+        for event in reversed(self._events(gate)):
+            if event.image_hash is None:
+                continue
+            if (event.image_hash ^ image_hash).bit_count() <= self.max_distance:
+                return event
+        return None
+
+    def match_plate(self, gate: str, plate: str) -> GateEvent | None:
+        """подія з тим самим номером на цьому шлагбаумі"""
+        if self.window <= 0:
+            return None
+        for event in reversed(self._events(gate)):
+            if event.plate == plate:
+                return event
+        return None
+
+    def remember(
+        self, gate: str, plate: str, image_hash: int | None, response=None, error=None
+    ):
+        if self.window <= 0:
+            return
+        if error is not None and (error.status_code == 409 or error.status_code >= 500):
+            return
+        event = GateEvent(plate, image_hash, response, error)
+        event.expires_at = time.monotonic() + self.window
+        self._events(gate)
+        self._gate(gate).append(event)
+
+    def clear(self):
+        self._gates.clear()
+
+
+plate_tracker = PlateTracker(
+    window=config.GATE_REPEAT_WINDOW,
+    max_distance=config.GATE_REPEAT_HASH_DISTANCE,
+    max_gates=config.GATE_REPEAT_MAX_GATES,
+)
@@ -0,0 +1,110 @@
+import math
+
+import cv2
+import numpy as np
+
+CHAR_SIZE = (20, 40)  # (ширина, висота) символу після cv2.resize
+CANVAS_SHAPE = (44, 24)  # символ з чорною рамкою у 2 пікселі
+MODEL_SIZE = 28  # вхід моделі: (28, 28, 3)
+
+
+def _area_taps(src_size: int, dst_size: int):
+    """
+    Коефіцієнти cv2.resize(..., interpolation=cv2.INTER_AREA) вздовж однієї осі,
+    коли хоча б одна вісь збільшується (44x24 -> 28x28: ширина 24 -> 28).
+    У цьому разі OpenCV не усереднює площі, а виконує білінійну інтерполяцію
+    з двома відліками та float32-вагами, обчисленими так само, як тут.
+
+    :return: (індекси першого відліку, індекси другого відліку, ваги (dst, 2))
+    """
+    inv_scale = dst_size / src_size
+    scale = 1 / inv_scale
+    first, weights = [], []
+    for d in range(dst_size):
+        s = math.floor(d * scale)
+        f = np.float32((d + 1) - (s + 1) * inv_scale)
+        f = np.float32(0) if f <= 0 else np.float32(f - math.floor(f))
+        if s >= src_size - 1:
+            s, f = src_size - 1, np.float32(0)
+        first.append(s)
+        weights.append((np.float32(1) - f, f))
+    first = np.array(first)
+    second = np.minimum(first + 1, src_size - 1)
+    return first, second, np.array(weights, dtype=np.float32).astype(np.float64)
+
+
+X_FIRST, X_SECOND, X_WEIGHTS = _area_taps(CANVAS_SHAPE[1], MODEL_SIZE)
+Y_FIRST, Y_SECOND, Y_WEIGHTS = _area_taps(CANVAS_SHAPE[0], MODEL_SIZE)
+# останні стовпці OpenCV рахує одним відліком (x * 1.0), без додавання x * 0.0
+X_SINGLE = X_FIRST >= CANVAS_SHAPE[1] - 1
+
+
+def resize_canvases(canvases: np.ndarray) -> np.ndarray:
+    """
+    Те саме, що cv2.resize(canvas.astype(float64), (28, 28), cv2.INTER_AREA)
+    для кожного символу, але для всього пакета одразу. Порядок множень і
+    додавань повторює OpenCV, тож результат збігається побітово.
+
+    :param canvases: np.ndarray: (N, 44, 24) символи на полотні
+    :return: np.ndarray: (N, 28, 28) float64
+    """
+    src = canvases.astype(np.float64)
+    rows = src[:, :, X_FIRST] * X_WEIGHTS[:, 0] + src[:, :, X_SECOND] * X_WEIGHTS[:, 1]
+    rows[:, :, X_SINGLE] = src[:, :, X_FIRST[X_SINGLE]] * X_WEIGHTS[X_SINGLE, 0]
+    return (
+        rows[:, Y_FIRST, :] * Y_WEIGHTS[:, 0, None]
+        + rows[:, Y_SECOND, :] * Y_WEIGHTS[:, 1, None]
+    )
+
+
+def character_canvases(binary_img: np.ndarray, rects) -> np.ndarray:
+    """
+    Вирізає символи з бінарного зображення номера: кожен символ змінюється до
+    20x40, інвертується та розміщується на чорному полотні 44x24.
+
+    :param binary_img: np.ndarray: бінарне зображення номера (uint8)
+    :param rects: прямокутники (x, y, w, h) символів у потрібному порядку
+    :return: np.ndarray: (N, 44, 24) uint8
+    """
+    canvases = np.zeros((len(rects), *CANVAS_SHAPE), dtype=np.uint8)
+    inner = canvases[:, 2:42, 2:22]
+    for i, (x, y, w, h) in enumerate(rects):
+        char = cv2.resize(binary_img[y : y + h, x : x + w], CHAR_SIZE)
+        np.subtract(255, char, out=inner[i])
+    return canvases
+
+
+class CharacterBatch:
+    """
+    Підготовка символів до класифікації у попередньо виділеному float32 буфері.
+
+    Результат побітово збігається з тим, що раніше отримувала модель
+    (посимвольний cv2.resize INTER_AREA у float64 та fix_dimension), але
+    обчислюється для всіх символів одразу. Повернений масив - view
+    внутрішнього буфера: він дійсний до наступного виклику, тож один
+    екземпляр не можна ділити між потоками.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self._buffer = np.empty((capacity, MODEL_SIZE, MODEL_SIZE, 3), dtype=np.float32)
+
+    def _reserve(self, n: int) -> np.ndarray:
+        if n > len(self._buffer):
+            self._buffer = np.empty(
+                (max(n, 2 * len(self._buffer)), MODEL_SIZE, MODEL_SIZE, 3),
+                dtype=np.float32,
+            )
+        return self._buffer[:n]
+
+    def model_input(self, canvases: np.ndarray) -> np.ndarray:
+        """
+        :param canvases: np.ndarray: (N, 44, 24) символи на полотні
+        :return: np.ndarray: (N, 28, 28, 3) float32 - вхід моделі
+        """
+        out = self._reserve(len(canvases))
+        out[...] = resize_canvases(canvases)[..., None]
+        return out
+
+    def prepare(self, binary_img: np.ndarray, rects) -> np.ndarray:
+        """вирізання, зміна розміру, інверсія, рамка та канали - для всіх символів"""
+        return self.model_input(character_canvases(binary_img, rects))
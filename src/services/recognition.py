@@ -0,0 +1,427 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from concurrent.futures.process import BrokenProcessPool
+
+from src.conf.config import config
+from src.conf.constants import CHAR_CONFIDENCE_THRESHOLD
+from src.services.plate_format import (
+    NOT_RECOGNIZED,
+    choose_reading,
+    needs_ocr,
+    normalize_number,
+    validate_ukraine_plate,
+)
+from src.services.frame_ring import FrameRef, FrameRing, frame_view
+from src.services.recognition_cache import RecognitionCache
+from src.services.recognition_metrics import (
+    RecognitionMetrics,
+    RecognitionTrace,
+    recognition_metrics,
+)
+
+
+def _configure():
+    """
+    Ініціалізація процесу-воркера: бекенд класифікатора та параметри
+    каскаду з налаштувань або з файлу RECOGNITION_CASCADE_PARAMS.
+    """
+    from src.services.use_model import load_cascade_params, recognizer
+
+    # параметри з scripts/tune_cascade.py мають перевагу над налаштуваннями
+    tuned = load_cascade_params(config.RECOGNITION_CASCADE_PARAMS)
+    recognizer.configure(
+        config.RECOGNITION_BACKEND,
+        scale_factor=tuned.get("scale_factor", config.RECOGNITION_SCALE_FACTOR),
+        min_neighbors=tuned.get("min_neighbors", config.RECOGNITION_MIN_NEIGHBORS),
+        detect_min_side=tuned.get("detect_min_side", config.RECOGNITION_DETECT_MIN_SIDE),
+    )
+
+
+def _warm_up():
+    """
+    Завантажує каскад, модель Keras та PaddleOCR у поточному процесі.
+    Моделі лишаються завантаженими на весь час життя процесу-воркера.
+    """
+    from src.services.use_model import recognizer
+
+    recognizer.warm_up()
+    return True
+
+
+class RecognitionTimeout(Exception):
+    """розпізнавання не вклалося у відведений час (RECOGNITION_TIMEOUT)"""
+
+
+def _photo(frame):
+    """вміст фото: байти або кадр зі спільної пам'яті (FrameRef)"""
+    return frame_view(frame) if isinstance(frame, FrameRef) else frame
+
+
+# етапи покрокового розпізнавання: кожен повертає результат та свої етапи trace
+
+def _detect_stage(frame):
+    from src.services.use_model import recognizer
+
+    trace = RecognitionTrace()
+    return recognizer.detect_stage(_photo(frame), trace), trace.spans
+
+
+def _classify_stage(symbols):
+    from src.services.use_model import recognizer
+
+    trace = RecognitionTrace()
+    return recognizer.classify_stage(symbols, trace), trace.spans
+
+
+def _ocr_stage(frame, plate_rect):
+    from src.services.use_model import recognizer
+
+    trace = RecognitionTrace()
+    return recognizer.ocr_stage(_photo(frame), plate_rect, trace), trace.spans
+
+
+def _detect(frame):
+    from src.services.use_model import find_plate_rect, recognizer
+
+    # для виявлення досить зменшеного сірого кадру - повний кадр не декодується
+    gray, scale = recognizer.detection_input(_photo(frame))
+    if gray is None:
+        return None
+    return find_plate_rect(None, (gray, scale))
+
+
+def _recognize_batch(frames: list):
+    from src.services.use_model import processing_batch
+
+    return processing_batch([_photo(frame) for frame in frames])
+
+
+class RecognitionExecutor:
+    """
+    Пул процесів для розпізнавання номерів поза event loop.
+
+    Пул створюється у lifespan застосунку (start) і закривається при зупинці
+    (shutdown). Моделі завантажуються у воркері при першому розпізнаванні
+    або заздалегідь через warm_up. Якщо workers == 0, розпізнавання
+    виконується у стандартному пулі потоків event loop - без окремих
+    процесів, але теж не блокуючи loop.
+
+    Розпізнавання одного фото виконується покроково: виявлення, класифікація
+    та (за потреби) OCR-резерв - окремі завдання в пулі. Між етапами event
+    loop обслуговує інші запити, а скасований запит (таймаут timeout або
+    скасування задачі) не запускає наступних етапів; етап, що ще чекає
+    в черзі пулу, скасовується, етап, що вже виконується, завершується
+    у воркері, але його результат відкидається.
+
+    Фото передаються воркерам через кільце кадрів у спільній пам'яті
+    (frames): між процесами йде лише FrameRef, а не мегабайти JPEG.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        mp_context: str = "spawn",
+        cache: RecognitionCache = None,
+        metrics: RecognitionMetrics = None,
+        timeout: float | None = None,
+        frames: FrameRing = None,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.frames = frames
+        self.mp_context = mp_context
+        self.cache = cache
+        self.metrics = metrics
+        self._pool: ProcessPoolExecutor | None = None
+        # без пулу процесів розпізнавач налаштовується в цьому процесі один раз
+        self._configured = False
+        # пакети, що завершаться після таймауту - їх результати ще потраплять у кеш
+        self._late_batches: set[asyncio.Future] = set()
+        # кадри, які ще читають завдання у воркерах: FrameRef -> кількість завдань
+        self._frames_in_use: dict[FrameRef, int] = {}
+        # кадри, запит яких уже завершився (таймаут, скасування), - звільняються
+        # після останнього завдання
+        self._frames_to_release: set[FrameRef] = set()
+
+    def start(self):
+        if self._pool is not None:
+            return
+        if self.workers <= 0:
+            if not self._configured:
+                _configure()
+                self._configured = True
+            return
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.mp_context),
+            initializer=_configure,
+        )
+        if self.frames is not None:
+            self.frames.open()
+
+    async def warm_up(self):
+        """
+        Завантажує моделі заздалегідь (у всіх процесах пулу або, без пулу,
+        у поточному процесі), щоб перший запит не чекав на моделі.
+        """
+        loop = asyncio.get_running_loop()
+        tasks = max(self.workers, 1)
+        await asyncio.gather(
+            *[loop.run_in_executor(self._pool, _warm_up) for _ in range(tasks)]
+        )
+
+    def shutdown(self):
+        if self._pool is not None:
+            # завдання в черзі скасовуються, але ті, що вже виконуються, читають
+            # кадри зі спільної пам'яті - кільце закривається лише після них
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self.frames is not None:
+            self.frames.close()
+
+    @contextmanager
+    def _shared(self, photo: bytes):
+        """
+        Фото у слоті кільця кадрів (FrameRef) на час розпізнавання; без пулу
+        процесів, без вільного слоту або для завеликого фото - самі байти.
+
+        Якщо запит завершився раніше за завдання, що читає кадр у воркері
+        (таймаут, скасування), слот звільняється, лише коли завдання завершиться.
+        """
+        ref = self.frames.put(photo) if self._pool is not None and self.frames else None
+        try:
+            yield photo if ref is None else ref
+        finally:
+            if ref is not None:
+                if self._frames_in_use.get(ref):
+                    self._frames_to_release.add(ref)
+                else:
+                    self.frames.release(ref)
+
+    def _hold_frames(self, future, args):
+        """кадри з аргументів завдання зайняті, доки завдання не завершиться у воркері"""
+        refs = [
+            ref
+            for arg in args
+            for ref in (arg if isinstance(arg, list) else [arg])
+            if isinstance(ref, FrameRef)
+        ]
+        if not refs:
+            return
+        for ref in refs:
+            self._frames_in_use[ref] = self._frames_in_use.get(ref, 0) + 1
+        loop = asyncio.get_running_loop()
+
+        def done(_):
+            # колбек виконується в потоці пулу - звільнення в потоці event loop
+            try:
+                loop.call_soon_threadsafe(self._frames_done, refs)
+            except RuntimeError:
+                pass  # event loop уже закрито
+
+        future.add_done_callback(done)
+
+    def _frames_done(self, refs: list[FrameRef]):
+        for ref in refs:
+            left = self._frames_in_use[ref] - 1
+            if left:
+                self._frames_in_use[ref] = left
+                continue
+            del self._frames_in_use[ref]
+            if ref in self._frames_to_release:
+                self._frames_to_release.discard(ref)
+                self.frames.release(ref)
+
+    async def recognize(
+        self, photo: bytes, timeout: float | None = None
+    ) -> tuple[str, bool, float]:
+        """
+        Розпізнає номер на фото в окремому процесі.
+        Повторно надіслане те саме зображення береться з кешу.
+
+        :param photo: bytes: вміст завантаженого зображення
+        :param timeout: float: ліміт часу в секундах (None - self.timeout)
+        :return: (номер, чи розпізнано, впевненість)
+        :raises RecognitionTimeout: якщо розпізнавання не вклалося в timeout
+        """
+        result, _ = await self.recognize_traced(photo, timeout)
+        return result
+
+    async def recognize_traced(
+        self, photo: bytes, timeout: float | None = None
+    ) -> tuple[tuple[str, bool, float], dict]:
+        """
+        Те саме, що recognize, але разом з етапами розпізнавання
+        (RecognitionTrace.as_dict). Етапи потрапляють у метрики.
+
+        :param photo: bytes: вміст завантаженого зображення
+        :param timeout: float: ліміт часу в секундах (None - self.timeout)
+        :return: ((номер, чи розпізнано, впевненість), trace)
+        :raises RecognitionTimeout: якщо розпізнавання не вклалося в timeout
+        """
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(photo)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                if self.metrics is not None:
+                    self.metrics.record_cached()
+                # з кешу - без етапів розпізнавання
+                trace = {
+                    "spans": [],
+                    "fallback": False,
+                    "confidence": cached[2],
+                    "cached": True,
+                }
+                return cached, trace
+
+        trace = RecognitionTrace()
+        with self._shared(photo) as frame:
+            result = await self._with_timeout(self._recognize_stages(frame, trace), timeout)
+        trace = trace.as_dict()
+        if self.metrics is not None:
+            self.metrics.record(trace)
+
+        if key is not None:
+            await self.cache.set(key, result)
+        return result, trace
+
+    async def _recognize_stages(self, frame, trace: RecognitionTrace):
+        """етапи розпізнавання одного фото, кожен - окремим завданням у пулі"""
+        detected, spans = await self._run(_detect_stage, frame)
+        trace.spans += spans
+        if detected is None:
+            return NOT_RECOGNIZED, False, 0.0
+        plate_rect, symbols = detected
+
+        plate_number_, confidence = NOT_RECOGNIZED, 0.0
+        if symbols is not None:
+            (plate_number_, confidence), spans = await self._run(_classify_stage, symbols)
+            trace.spans += spans
+
+        if needs_ocr(plate_number_, confidence, CHAR_CONFIDENCE_THRESHOLD):
+            trace.fallback = True
+            (ocr_number, ocr_confidence), spans = await self._run(_ocr_stage, frame, plate_rect)
+            trace.spans += spans
+            plate_number_, confidence = choose_reading(
+                plate_number_, confidence, ocr_number, ocr_confidence
+            )
+
+        plate_number_ = normalize_number(plate_number_)
+        trace.confidence = round(confidence, 4)
+        return plate_number_, validate_ukraine_plate(plate_number_), trace.confidence
+
+    async def _with_timeout(self, coro, timeout: float | None):
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(coro, timeout or None)
+        except asyncio.TimeoutError:
+            raise RecognitionTimeout(f"Recognition timed out after {timeout} s") from None
+
+    async def recognize_batch(
+        self, photos: list[bytes], timeout: float | None = None
+    ) -> list[tuple[str, bool, float]]:
+        """
+        Розпізнає номери на кількох фото одним завданням у пулі: класифікація
+        символів усіх номерів виконується одним пакетом.
+
+        :param photos: list[bytes]: вміст завантажених зображень
+        :param timeout: float: ліміт часу на весь пакет (None - self.timeout
+            на кожне фото, яке немає в кеші)
+        :return: [(номер, чи розпізнано, впевненість), ...] у тому ж порядку
+        :raises RecognitionTimeout: якщо пакет не вклався в timeout; пакет
+            усе одно доробляється у воркері, і його результати йдуть у кеш
+        """
+        results: list[tuple | None] = [None] * len(photos)
+        keys = [None] * len(photos)
+        if self.cache is not None:
+            for i, photo in enumerate(photos):
+                keys[i] = self.cache.key(photo)
+                results[i] = await self.cache.get(keys[i])
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            if timeout is None and self.timeout:
+                timeout = self.timeout * len(missing)
+            with ExitStack() as stack:
+                frames = [stack.enter_context(self._shared(photos[i])) for i in missing]
+                batch = asyncio.ensure_future(self._run(_recognize_batch, frames))
+                try:
+                    recognized = await self._with_timeout(asyncio.shield(batch), timeout)
+                except RecognitionTimeout:
+                    if self.cache is not None:
+                        self._cache_late(batch, [keys[i] for i in missing])
+                    raise
+            for i, result in zip(missing, recognized):
+                results[i] = result
+                if keys[i] is not None:
+                    await self.cache.set(keys[i], result)
+        return results
+
+    def _cache_late(self, batch: asyncio.Future, keys: list[str]):
+        """результати пакета, що не вклався в таймаут, - у кеш, коли він завершиться"""
+
+        async def store():
+            try:
+                recognized = await batch
+            except Exception:
+                return
+            for key, result in zip(keys, recognized):
+                await self.cache.set(key, result)
+
+        task = asyncio.ensure_future(store())
+        self._late_batches.add(task)
+        task.add_done_callback(self._late_batches.discard)
+
+    async def detect(self, photo: bytes) -> tuple[int, int, int, int] | None:
+        """
+        Лише виявлення номерного знака каскадом (без класифікації та OCR).
+
+        :param photo: bytes: кадр з камери
+        :return: (x, y, w, h) номерного знака або None
+        """
+        with self._shared(photo) as frame:
+            return await self._run(_detect, frame)
+
+    async def _run(self, func, *args):
+        if self._pool is None:
+            self.start()
+        pool = self._pool
+        try:
+            return await self._submit(pool, func, args)
+        except BrokenProcessPool:
+            # воркер впав (наприклад, OOM) - перезапускаємо пул і пробуємо ще раз;
+            # кільце кадрів лишається: кадри в ньому ще потрібні. Пул
+            # перезапускає лише перше завдання, що побачило саме цей зламаний
+            # пул, - решта повторюють спробу в уже перезапущеному
+            if self._pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                self.start()
+            return await self._submit(self._pool, func, args)
+
+    def _submit(self, pool, func, args) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if pool is None:
+            return loop.run_in_executor(None, func, *args)
+        future = pool.submit(func, *args)
+        self._hold_frames(future, args)
+        return asyncio.wrap_future(future, loop=loop)
+
+
+recognition_cache = RecognitionCache(
+    max_entries=config.RECOGNITION_CACHE_SIZE, ttl=config.RECOGNITION_CACHE_TTL
+)
+
+recognition_executor = RecognitionExecutor(
+    workers=config.RECOGNITION_WORKERS,
+    mp_context=config.RECOGNITION_MP_CONTEXT,
+    cache=recognition_cache,
+    metrics=recognition_metrics,
+    timeout=config.RECOGNITION_TIMEOUT,
+    frames=FrameRing(
+        slots=config.RECOGNITION_FRAME_SLOTS, slot_size=config.RECOGNITION_FRAME_SLOT_SIZE
+    ),
+)
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+from redis.exceptions import RedisError
+
+
+class RecognitionCache:
+    """
+    Кеш результатів розпізнавання за хешем вмісту зображення.
+
+    Перший рівень - LRU у пам'яті процесу з обмеженою кількістю записів
+    та TTL. Другий (необов'язковий) рівень - Redis, спільний для всіх
+    воркерів API. Камери на шлагбаумі часто повторно надсилають той самий
+    кадр, тож повторне завантаження не проходить розпізнавання знову.
+    Запис з Redis живе в LRU лише залишок свого TTL у Redis.
+    """
+
+    def __init__(self, max_entries: int, ttl: int, redis=None, prefix="recognition:"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis = redis
+        self.prefix = prefix
+        self._entries: OrderedDict[str, tuple[float, tuple]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+
+    @staticmethod
+    def key(photo: bytes) -> str:
+        return hashlib.blake2b(photo, digest_size=16).hexdigest()
+
+    async def get(self, key: str) -> tuple | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        if self.redis is not None:
+            name = self.prefix + key
+            try:
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    raw, ttl_ms = await pipe.get(name).pttl(name).execute()
+            except RedisError:
+                raw = None
+            if raw is not None:
+                value = tuple(json.loads(raw))
+                # залишок TTL ключа в Redis (-1 - ключ без TTL)
+                ttl = min(ttl_ms / 1000, self.ttl) if ttl_ms > 0 else self.ttl
+                self._put_local(key, value, ttl)
+                self.hits += 1
+                self.redis_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: tuple):
+        self._put_local(key, value)
+        if self.redis is not None:
+            try:
+                await self.redis.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+            except RedisError:
+                pass
+
+    def _put_local(self, key: str, value: tuple, ttl: float | None = None):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def render(self) -> str:
+        """лічильники влучань (за рівнем кешу) та промахів у форматі Prometheus"""
+        lines = [
+            "# HELP recognition_cache_hits_total Recognition cache lookups that found a result",
+            "# TYPE recognition_cache_hits_total counter",
+            f'recognition_cache_hits_total{{tier="local"}} {self.hits - self.redis_hits}',
+            f'recognition_cache_hits_total{{tier="redis"}} {self.redis_hits}',
+            "# HELP recognition_cache_misses_total Recognition cache lookups that found nothing",
+            "# TYPE recognition_cache_misses_total counter",
+            f"recognition_cache_misses_total {self.misses}",
+            "# HELP recognition_cache_entries Results held in the in-process cache",
+            "# TYPE recognition_cache_entries gauge",
+            f"recognition_cache_entries {len(self._entries)}",
+        ]
+        return "\n".join(lines) + "\n"
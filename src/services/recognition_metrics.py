@@ -0,0 +1,103 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from src.services.metrics import Histogram
+
+# межі кошиків гістограм: тривалість етапу (секунди) та впевненість
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CONFIDENCE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 0.99, 1)
+
+
+class RecognitionTrace:
+    """
+    Етапи одного розпізнавання (decode, cascade, segment, classify, ocr)
+    з тривалістю, а також чи спрацював OCR-резерв і підсумкова впевненість.
+
+    Заповнюється у процесі-воркері і повертається разом з результатом
+    у вигляді словника (as_dict).
+    """
+
+    def __init__(self):
+        self.spans: list[tuple[str, float]] = []
+        self.fallback = False
+        self.confidence = 0.0
+
+    @contextmanager
+    def span(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((stage, time.perf_counter() - started))
+
+    def as_dict(self) -> dict:
+        return {
+            "spans": [
+                {
+                    "stage": stage,
+                    "duration_ms": round(duration * 1000, 3),
+                    "fallback": self.fallback,
+                    "confidence": self.confidence,
+                }
+                for stage, duration in self.spans
+            ],
+            "fallback": self.fallback,
+            "confidence": self.confidence,
+        }
+
+
+class RecognitionMetrics:
+    """
+    Метрики розпізнавання в процесі API: гістограми тривалості етапів
+    та впевненості, лічильники розпізнавань (з OCR-резервом та з кешу).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stage_seconds = Histogram(
+            "recognition_stage_seconds",
+            "Duration of a recognition stage",
+            STAGE_BUCKETS,
+            label="stage",
+        )
+        self.confidence = Histogram(
+            "recognition_confidence",
+            "Final confidence of a recognized plate",
+            CONFIDENCE_BUCKETS,
+        )
+        self.total = 0
+        self.fallbacks = 0
+        self.cached = 0
+
+    def record(self, trace: dict):
+        with self._lock:
+            self.total += 1
+            self.fallbacks += trace["fallback"]
+            for span in trace["spans"]:
+                self.stage_seconds.observe(span["duration_ms"] / 1000, span["stage"])
+            self.confidence.observe(trace["confidence"])
+
+    def record_cached(self):
+        with self._lock:
+            self.cached += 1
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                *self.stage_seconds.render(),
+                *self.confidence.render(),
+                "# HELP recognition_total Recognitions run by the pipeline",
+                "# TYPE recognition_total counter",
+                f"recognition_total {self.total}",
+                "# HELP recognition_fallback_total Recognitions that ran the OCR fallback",
+                "# TYPE recognition_fallback_total counter",
+                f"recognition_fallback_total {self.fallbacks}",
+                "# HELP recognition_cached_total Recognitions served from the cache",
+                "# TYPE recognition_cached_total counter",
+                f"recognition_cached_total {self.cached}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+recognition_metrics = RecognitionMetrics()
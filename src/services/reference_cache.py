@@ -0,0 +1,105 @@
+import logging
+import time
+from typing import NamedTuple
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import config
+from src.models.models import Rate, Setting
+
+logger = logging.getLogger(__name__)
+
+
+class RateValues(NamedTuple):
+    id: int
+    price: int
+
+
+class SettingValues(NamedTuple):
+    id: int
+    capacity: int
+    num_days_reminder: int | None
+    num_days_benefit: int | None
+
+
+class ReferenceCache:
+    """
+    Кеш тарифів (rates) та налаштувань (settings) у пам'яті процесу.
+
+    Таблиці змінюються кілька разів на рік, а читаються при кожній оплаті
+    та події на шлагбаумі. Кеш читає обидві таблиці двома запитами і
+    тримає копію значень (не ORM-об'єкти). Запис через репозиторії rates
+    та settings збільшує версію в Redis (invalidate); інші воркери API
+    звіряють свою версію не частіше ніж раз на check_interval секунд і
+    перечитують таблиці, якщо вона змінилася. Без Redis кеш просто
+    перечитується кожні check_interval секунд.
+    """
+
+    def __init__(self, check_interval: float, redis=None, key="reference:version"):
+        self.check_interval = check_interval
+        self.redis = redis
+        self.key = key
+        self._rates: dict[str, RateValues] = {}
+        self._setting: SettingValues | None = None
+        self._version: str | None = None
+        self._checked_at: float | None = None
+        self.loads = 0
+
+    async def rate(self, name: str, db: AsyncSession) -> RateValues | None:
+        await self._refresh(db)
+        return self._rates.get(name.lower())
+
+    async def setting(self, db: AsyncSession) -> SettingValues | None:
+        await self._refresh(db)
+        return self._setting
+
+    async def invalidate(self):
+        """після зміни тарифів чи налаштувань - для цього та інших воркерів"""
+        self._checked_at = None
+        if self.redis is not None:
+            try:
+                await self.redis.incr(self.key)
+            except RedisError as e:
+                logger.warning("reference cache version not bumped: %s", e)
+
+    async def _remote_version(self) -> str | None:
+        if self.redis is None:
+            return None
+        try:
+            return await self.redis.get(self.key) or "0"
+        except RedisError:
+            return None
+
+    async def _refresh(self, db: AsyncSession):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        # версія читається до таблиць: зміна під час читання - перечитування наступного разу
+        version = await self._remote_version()
+        if self._checked_at is None or version is None or version != self._version:
+            await self._load(db)
+            self._version = version
+        self._checked_at = now
+
+    async def _load(self, db: AsyncSession):
+        rates = (await db.execute(select(Rate).order_by(Rate.id))).scalars().all()
+        setting = (await db.execute(select(Setting))).scalars().first()
+        self._rates = {
+            rate.rate_name.lower(): RateValues(rate.id, rate.price) for rate in reversed(rates)
+        }
+        self._setting = (
+            SettingValues(
+                setting.id,
+                setting.capacity,
+                setting.num_days_reminder,
+                setting.num_days_benefit,
+            )
+            if setting is not None
+            else None
+        )
+        self.loads += 1
+
+
+reference_cache = ReferenceCache(config.REFERENCE_CACHE_CHECK_INTERVAL)
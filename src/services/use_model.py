@@ -1,17 +1,32 @@
+import json
 import os
-import re
+import threading
+from contextlib import nullcontext
 
 os.environ["TF_ENABLE_ONEDNN_OPTS"] = "0"
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
 
-from keras.models import load_model
-from matplotlib import pyplot as plt
-
 import cv2
 import numpy as np
-from paddleocr import PaddleOCR
 
-from src.conf.constants import IMAGES, NOT_NUMBER
+from src.services.inference import MODEL_PATHS, load_backend
+from src.services.preprocessing import CharacterBatch, character_canvases
+
+from src.services.plate_format import (
+    NOT_NUMBERS,
+    NOT_RECOGNIZED,
+    PLATE_CHARS,
+    choose_reading,
+    clean_token,
+    is_top_row,
+    merge_rows,
+    needs_ocr,
+    normalize_number,
+    top_row_letters,
+    validate_ukraine_plate,
+)
+
+from src.conf.constants import IMAGES, CHAR_CONFIDENCE_THRESHOLD
 
 # from colors import YELLOW, BLUE, LIGHTBLUE, CYAN, GRAY, RESET
 
@@ -31,17 +46,32 @@ TAB = "\t"
 
 PHOTO_FOLDER = "src/static/images/"
 MODEL_CASCADE = "src/models/haarcascade_ua_license_plate.xml"
-MODEL_KERAS = "src/models/model_ua_license_plate.keras"
-TMP_DIR = "tmp"
-TMP = "tmp/contour.jpg"
+MODEL_KERAS = MODEL_PATHS["keras"]
 BOX_COLOR = (220, 220, 220)
 
+# OCR-резерв: відступи навколо номера (частка ширини та висоти номера),
+# мінімальна ширина області номера та максимальна сторона повного кадру
+OCR_ROI_PADDING = (0.15, 0.35)
+OCR_ROI_MIN_WIDTH = 480
+OCR_MAX_SIDE = 1280
+
+# виявлення номера каскадом на зменшеному сірому кадрі: кадр декодується
+# одразу зменшеним (у 4 або 2 рази, масштабування JPEG при декодуванні),
+# але не менше DETECT_MIN_SIDE пікселів по більшій стороні
+DETECT_MIN_SIDE = 800
+REDUCED_GRAYSCALE = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+}
+
+# параметри каскаду за замовчуванням (прототипи в DS використовують 1.15 та 7)
+CASCADE_SCALE_FACTOR = 1.4
+CASCADE_MIN_NEIGHBORS = 7
+# параметри, які підбирає scripts/tune_cascade.py (аргументи PlateRecognizer.configure)
+CASCADE_PARAMS = ("scale_factor", "min_neighbors", "detect_min_side")
+
 
-# Проверка наличия папки и создание её, если она не существует
-if not os.path.exists(TMP_DIR):
-    os.makedirs(TMP_DIR)
-    
-    
 # Функції:
 
 
@@ -49,6 +79,8 @@ def display_image(img_, title="", recognized=True):
     """
     функція виводу зображень з заголовком
     """
+    from matplotlib import pyplot as plt
+
     img_display = cv2.cvtColor(img_, cv2.COLOR_BGR2RGB)
 
     plt.figure(figsize=(10, 6))
@@ -66,126 +98,81 @@ def draw_number_border(plate_img, plate_rect, color_=""):
         cv2.rectangle(plate_img, (x + 2, y), (x + w - 3, y + h - 5), border_color, 3)
 
 
-def detect_plate(img_, text=""):
+def detect_plate(img_, text="", detection=None, draw=True):
     """
-    Функція призначена для виявлення та обробки номерних знаків на зображенні.
-
-    Параметри:
-    img (numpy.array): Зображення, на якому потрібно виявити та обробити номерні знаки.
-    text (str, optional): Текст, який можна додати на зображення навколо номерного знаку.
-
-    Повертає:
-    numpy.array: Зображення з виділеними номерними знаками та, за бажанням, доданим текстом.
-    numpy.array or None: Зображення області номерного знаку для подальшої обробки або None, якщо номерний знак не був виявлений.
-    """
-    plate_img = img_.copy()  # перша копія зображення
-    reg_of_intr = img_.copy()  # друга копія зображення
-    # display_image(img_)
-    # виявляє номерні знаки та повертає координати та розміри виявлених контурів номерних знаків
-    plate_rect = plate_cascade.detectMultiScale(
-        plate_img, scaleFactor=1.4, minNeighbors=7
-    )
+    Виявлення номерного знака розпізнавачем за замовчуванням.
+    Див. PlateRecognizer.detect_plate.
+    """
+    return recognizer.detect_plate(img_, text, detection, draw)
 
-    if len(plate_rect) > 0:
-        plate_rect = plate_rect[[len(plate_rect) - 1]]
 
-    # виділення частини номерного знака для розпізнавання
-    for x, y, w, h in plate_rect:
-        plate_ = reg_of_intr[y : y + h, x : x + w, :]
-        # малювання прямокутника по межі номера
-        draw_number_border(plate_img, plate_rect)
-        cv2.rectangle(plate_img, (x + 2, y), (x + w - 3, y + h - 5), (51, 181, 155), 3)
-
-    # Додавання тексту
-    if text != "":
-        plate_img = cv2.putText(
-            plate_img,
-            text,
-            (x - w // 2, y - h // 2),
-            cv2.FONT_HERSHEY_COMPLEX_SMALL,
-            0.5,
-            (51, 181, 155),
-            1,
-            cv2.LINE_AA,
-        )
+def find_plate_rect(img_, detection=None):
+    """див. PlateRecognizer.find_plate_rect"""
+    return recognizer.find_plate_rect(img_, detection)
 
-    # Повертаємо оброблене зображення з виділеними номерними знаками та область номерного знаку
-    return plate_img, plate_, plate_rect
 
 def processing_number_text(result):
+    """
+    Вибір номера з результату PaddleOCR.
+
+    Повертає:
+    (str, float): номер та впевненість OCR для нього
+    """
     text_up = ""
+    score_up = 0.0
+    output_text = ""
+    output_score = 0.0
 
     for line in result:
-        
+        if not line:  # PaddleOCR повертає [None], якщо тексту не знайдено
+            continue
+
         for word in line:
 
-            text_pred = word[1][0].strip().replace("\n", "").replace(" ", "")
-            if len(text_pred) == 8:
-                text_pred = correction_ua_number(text_pred)
+            text_pred = clean_token(word[1][0])
+            score = float(word[1][1])
+            text_pred = normalize_number(text_pred)
 
-            if text_pred in NOT_NUMBER:
+            if text_pred in NOT_NUMBERS:
                 continue
 
-            # для американських номерів (в 2 ряди)
-            if re.match(r"^[A-Z0-9]{4}$", text_pred) and text_up == "":
+            # для номерів в 2 ряди (верхній рядок - літери, нижній - цифри)
+            if is_top_row(text_pred) and text_up == "":
                 text_up = text_pred
+                score_up = score
                 print(f"->> {text_up = }")
-                text_up_list = list(text_up)
-                for i in range(len(text_up_list)):
-                    text_up_list[i] = (
-                        text_up_list[i]
-                        .replace("1", "I")
-                        .replace("i", "I")
-                        .replace("|", "I")
-                        .replace("0", "O")
-                        .replace("7", "Z")
-                        .replace("8", "B")
-                        .replace("5", "B")
-                    )
-                text_up = "".join(text_up_list)
+                text_up = top_row_letters(text_up)
                 print(f"+>> {text_up = }")
 
-            elif re.match(r"^\d{4}$", text_pred) and re.match(r"^[A-Z]{4}$", text_up):
-                text_pred = text_up[:2] + text_pred + text_up[2:]
+            elif (merged := merge_rows(text_up, text_pred)) is not None:
+                text_pred = merged
+                score = min(score, score_up)
                 text_up = ""
 
             output_text = text_pred
+            output_score = score
             # print(f">-> {output_text = }")
 
-            if re.match(r"^[A-Z0-9]+$", output_text):
+            if PLATE_CHARS.match(output_text):
                 if validate_ukraine_plate(output_text):
                     print(f"Detected License Plate: \033[33m{output_text}\033[0m")
                 else:
                     print(f"-Invalid License Plate: \033[31m{output_text}\033[0m")
                     # print(f">-- {output_text = }")
         # print(f"--> {output_text = }")
-    return output_text
-
-# Initialize PaddleOCR with English language model
-ocr = PaddleOCR(
-    use_angle_cls=True,
-    lang="en",
-    use_gpu=True,
-    total_process_num=os.cpu_count() * 2 - 1,
-    show_log=False,
-)
+    return output_text, output_score
 
 # Extract license plate text using PaddleOCR
 def extract_license_plate_text(image_path):
-
-    # OCR debug - сірим кольором
-    print("\033[90m", end="")
-    result = ocr.ocr(image_path)
-    print("\033[0m", end="")
-
-    return processing_number_text(result)
+    """див. PlateRecognizer.extract_license_plate_text"""
+    return recognizer.extract_license_plate_text(image_path)
 
 # Not working now - detect_square _plate
 # def detect_square_plate(img, text=""):
 #     plate_img = img.copy()
 #     roi = img.copy()
 #     plate = None  # Initialize plate with a default value
-#     plate_rect = plate_cascade.detectMultiScale(
+#     plate_rect = recognizer.cascade.detectMultiScale(
 #         plate_img, scaleFactor=1.6, minNeighbors=8
 #     )
 #     for x, y, w, h in plate_rect:
@@ -215,9 +202,11 @@ def find_contours(dimensions, img_, echo=True):
         dimensions (list): Список, що містить набір розмірів контурів символів:
                            lower_width, upper_width, lower_height та upper_height.
         img (numpy.ndarray): Вхідне зображення, на якому потрібно знайти контури символів.
+        echo (bool): Малювати знайдені контури (лише для налагодження).
 
     Повертає:
-        numpy.ndarray: Масив, що містить зображення контурів символів, відсортованих за координатою x.
+        numpy.ndarray: Масив (N, 44, 24) uint8, що містить зображення символів
+        (інвертовані, з чорною рамкою), відсортованих за координатою x.
     """
 
     # Знайти всі контури на зображенні
@@ -232,62 +221,36 @@ def find_contours(dimensions, img_, echo=True):
     # Check largest 5 or  15 contours for license plate or character respectively
     cntrs = sorted(cntrs, key=cv2.contourArea, reverse=True)[:15]
 
-    ii = cv2.imread(tmp_file)
+    # копія для налагоджувального малювання - лише на вимогу, без файлів на диску
+    ii = cv2.cvtColor(img_, cv2.COLOR_GRAY2BGR) if echo else None
 
-    x_cntr_list = []
-    img_res = []
-    # target_contours = []
+    char_rects = []
     for cntr in cntrs:
         # detects contour in binary image and returns the coordinates of rectangle enclosing it
         intX, intY, intWidth, intHeight = cv2.boundingRect(cntr)
 
         # checking the dimensions of the contour to filter out the characters by contour's size
-        # if all(intWidth > lower_width, intWidth < upper_width, intHeight > lower_height, intHeight < upper_height):
         if (
             intWidth > lower_width
             and intWidth < upper_width
             and intHeight > lower_height
             and intHeight < upper_height
         ):
-            # stores the x coordinate of the character's contour,
-            # to used later for indexing the contours
-            x_cntr_list.append(intX)
+            char_rects.append((intX, intY, intWidth, intHeight))
 
-            char_copy = np.zeros((44, 24))
-            # extracting each character using the enclosing rectangle's coordinates.
-            char = img_[intY : intY + intHeight, intX : intX + intWidth]
-            char = cv2.resize(char, (20, 40))
-
-            cv2.rectangle(
-                ii, (intX, intY), (intWidth + intX, intY + intHeight), (76, 202, 102), 2
-            )
             if echo:
-                plt.imshow(ii, cmap="gray")
-
-            # Make result formatted for classification: invert colors
-            char = cv2.subtract(255, char)
+                from matplotlib import pyplot as plt
 
-            # Resize the image to 24x44 with black border
-            char_copy[2:42, 2:22] = char
-            char_copy[0:2, :] = 0
-            char_copy[:, 0:2] = 0
-            char_copy[42:44, :] = 0
-            char_copy[:, 22:24] = 0
-
-            # List that stores the character's binary image (unsorted)
-            img_res.append(char_copy)
+                cv2.rectangle(
+                    ii, (intX, intY), (intWidth + intX, intY + intHeight), (76, 202, 102), 2
+                )
+                plt.imshow(ii, cmap="gray")
 
-    # Return characters on ascending order with respect to the x-coord (most-left character first)
-    # if echo:
-    #     plt.show()
+    # characters in ascending order of the x-coord (most-left character first)
+    char_rects.sort(key=lambda rect: rect[0])
 
-    # arbitrary function that stores sorted list of character indeces
-    indices = sorted(range(len(x_cntr_list)), key=lambda k: x_cntr_list[k])
-    img_res_copy = []
-    for idx in indices:
-        # stores character images according to their index
-        img_res_copy.append(img_res[idx])
-    img_res = np.array(img_res_copy)
+    # вирізання, зміна розміру, інверсія та рамка - див. preprocessing.character_canvases
+    img_res = character_canvases(img_, char_rects)
 
     return img_res
 
@@ -329,16 +292,14 @@ def segment_characters(image_, echo=True):
     dimensions = [lp_width / 6, lp_width / 2, lp_height / 10, 2 * lp_height / 3]
 
     if echo:
+        from matplotlib import pyplot as plt
+
         plt.imshow(img_binary_lp, cmap="gray")  # Display the binary image
-    if echo:
         plt.show()
 
-    # Save the binary image to a file
-    cv2.imwrite(tmp_file, img_binary_lp)
-
-    # Get contours within cropped license plate
+    # Get contours within cropped license plate (в пам'яті, без тимчасових файлів)
     char_list = find_contours(
-        dimensions, img_binary_lp, echo=False
+        dimensions, img_binary_lp, echo=echo
     )  # Find character contours
 
     return char_list  # Return the list of character contours
@@ -354,88 +315,43 @@ def fix_dimension(img):
     Повертає:
     numpy.ndarray: Зображення з розмірами (28, 28, 3), де 3 - кількість каналів (RGB).
     """
-    new_img = np.zeros((28, 28, 3))
-    for i in range(3):
-        new_img[:, :, i] = img
-    return new_img
-
-
-def correction_ua_number(text: str) -> str:
-    # позиційна обробка ["1", "0", "7", '8'] <-> ["I", "O", "Z", 'B']
-    # if len(text) == 8:
-    # ризиковано: наприклад "00OOOO00" буде перетворено на "OO0000OO"
-    # "88BBBB88" -> "BB8888BB", "10BIGG88" -> "IO8166BB"
-    # "BOSS2000" -> "BO9920OO"
-    text_list = list(text)
-
-    for i in [0, 1, 6, 7]:
-        text_list[i] = (
-            text_list[i]
-            .replace("1", "I")
-            .replace("i", "I")
-            .replace("|", "I")
-            .replace("0", "O")
-            .replace("7", "Z")
-            .replace("8", "B")
-            .replace("5", "B")
-        )
+    return np.repeat(np.asarray(img, dtype=np.float64)[:, :, np.newaxis], 3, axis=2)
+
+
+CHARACTERS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+CHARACTERS_ARRAY = np.array(list(CHARACTERS))
 
-    for i in [2, 3, 4, 5]:
-        text_list[i] = (
-            text_list[i]
-            .replace("I", "1")
-            .replace("|", "1")
-            .replace("O", "0")
-            .replace("J", "3")
-            .replace("G", "6")
-            .replace("A", "6")
-            .replace("Z", "7")
-            .replace("B", "8")
-            .replace("Y", "9")
-            .replace("S", "9")
-        )
 
-    text = "".join(text_list)
-    return text
+def prepare_characters(char):
+    """див. PlateRecognizer.prepare_characters"""
+    return recognizer.prepare_characters(char)
 
+def classify_numbers(chars_list):
+    """див. PlateRecognizer.classify_numbers"""
+    return recognizer.classify_numbers(chars_list)
 
-def validate_ukraine_plate(text):
+
+def prediction_numbers(chars_list):
     """
-    Validate Ukrainian plate format
+    Розпізнавання символів одразу для кількох номерних знаків.
+    Повертає:
+    list[str]: Розпізнані номери у тому ж порядку.
     """
-    pattern = r"^[A-Z]{2}\d{4}[A-Z]{2}$"
-    return bool(re.match(pattern, text))
+    return [number for number, _ in classify_numbers(chars_list)]
 
 
 def prediction_number(char):
     """
     Функція для розпізнавання символів на номерному знаку.
+    Всі символи класифікуються одним пакетом (N, 28, 28, 3) за один прохід моделі.
     Параметри:
     char (list): Список зображень символів номерного знаку.
     Повертає:
     str: Рядок, що містить розпізнану номерну знаку, складену з окремих символів.
     """
-    dic = {}
-    characters = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    for i, c in enumerate(characters):
-        dic[i] = c
-
-    output = []
-    for i, ch in enumerate(char):  # ітеруємося по символах
-        img_ = cv2.resize(ch, (28, 28), interpolation=cv2.INTER_AREA)
-        img = fix_dimension(img_)
-        img = img.reshape(1, 28, 28, 3)  # підготовка зображення для моделі
-
-        # отримуємо ймовірності для кожного класу
-        y_proba = model.predict(img, verbose=0)[0]
-
-        y_ = np.argmax(y_proba)  # вибираємо клас з найвищою ймовірністю
-        character = dic[y_]  # отримуємо символ, відповідний прогнозованому класу
-        output.append(character)  # зберігаємо результат у списку
-
-    plate_number_result = "".join(output)  # об'єднуємо всі символи у рядок
-
-    return plate_number_result
+    if len(char) == 0:
+        return ""
+    return prediction_numbers([char])[0]
 
 
 def make_final_image(
@@ -479,67 +395,682 @@ def make_final_image(
     return img_output
 
 
+def decode_photo(photo):
+    """декодування завантаженого зображення з байтів"""
+    nparr = np.frombuffer(photo, np.uint8)
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+
+# маркери JPEG, після яких у заголовку кадру (SOF) записано розмір зображення
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def image_size(photo):
+    """
+    Розмір зображення (висота, ширина) із заголовка JPEG (SOF) чи PNG (IHDR)
+    без декодування. None для інших форматів або пошкодженого заголовка.
+    """
+    data = memoryview(photo)
+    if bytes(data[:8]) == PNG_SIGNATURE and len(data) >= 24:
+        return int.from_bytes(data[20:24], "big"), int.from_bytes(data[16:20], "big")
+    if bytes(data[:2]) != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # байти заповнення перед маркером
+            i += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height = int.from_bytes(data[i + 5 : i + 7], "big")
+            width = int.from_bytes(data[i + 7 : i + 9], "big")
+            return height, width
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:  # маркери без довжини
+            i += 2
+            continue
+        i += 2 + int.from_bytes(data[i + 2 : i + 4], "big")
+    return None
+
+
+def detection_scale(side, min_side=DETECT_MIN_SIDE):
+    """
+    У скільки разів (4, 2 чи 1) зменшити кадр з більшою стороною side для
+    каскаду, щоб зменшена сторона (libjpeg округлює вгору) була не менше min_side.
+    """
+    reduced = -(-side // 4)
+    if reduced >= min_side:
+        return 4
+    return 2 if reduced * 2 >= min_side else 1
+
+
+def decode_for_detection(photo, min_side=DETECT_MIN_SIDE, shape=None):
+    """
+    Декодування зображення для каскаду: одразу сірим та зменшеним
+    (масштабування JPEG при декодуванні дешевше за декодування повного
+    кадру і зменшення). Великі кадри (4K) зменшуються в 4 рази, менші -
+    в 2 рази або не зменшуються, щоб більша сторона була не менше min_side.
+
+    Масштаб обирається до декодування - за shape вже декодованого повного
+    кадру або за заголовком JPEG/PNG, тож кадр декодується один раз.
+    Інші формати декодуються повністю (сірим) і зменшуються cv2.resize.
+
+    Повертає:
+    (numpy.ndarray, int): сірий кадр та масштаб відносно повного зображення,
+    або (None, 1), якщо зображення не вдалося декодувати.
+    """
+    size = shape[:2] if shape is not None else image_size(photo)
+    nparr = np.frombuffer(photo, np.uint8)
+    if size is None:
+        gray = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            return None, 1
+        scale = detection_scale(max(gray.shape), min_side)
+        if scale > 1:
+            height, width = gray.shape
+            gray = cv2.resize(
+                gray, (-(-width // scale), -(-height // scale)), interpolation=cv2.INTER_AREA
+            )
+        return gray, scale
+
+    scale = detection_scale(max(size), min_side)
+    gray = cv2.imdecode(nparr, REDUCED_GRAYSCALE[scale])
+    if gray is None:
+        return None, 1
+    return gray, scale
+
+
+def plate_roi_for_ocr(img_, plate_rect):
+    """
+    Область номерного знака для OCR: з відступами навколо номера
+    та збільшена до OCR_ROI_MIN_WIDTH по ширині.
+    """
+    x, y, w, h = plate_rect[-1]
+    pad_x = int(w * OCR_ROI_PADDING[0])
+    pad_y = int(h * OCR_ROI_PADDING[1])
+    img_h, img_w = img_.shape[:2]
+    roi = img_[
+        max(0, y - pad_y) : min(img_h, y + h + pad_y),
+        max(0, x - pad_x) : min(img_w, x + w + pad_x),
+    ]
+    scale = OCR_ROI_MIN_WIDTH / roi.shape[1]
+    if scale > 1:
+        roi = cv2.resize(roi, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    return roi
+
+
+def downscale_for_ocr(img_):
+    """зменшення повного кадру до OCR_MAX_SIDE по більшій стороні"""
+    scale = OCR_MAX_SIDE / max(img_.shape[:2])
+    if scale >= 1:
+        return img_
+    return cv2.resize(img_, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def ocr_fallback(car_photo_imread, plate_rect):
+    """див. PlateRecognizer.ocr_fallback"""
+    return recognizer.ocr_fallback(car_photo_imread, plate_rect)
+
+
+def processing_with_confidence(photo, echo=True, log_on=False, trace=None):
+    """
+    основна функція розпізнавання номеру (розпізнавач за замовчуванням)
+
+    Повертає:
+    (str, bool, float): номер, чи розпізнано, впевненість
+    """
+    return recognizer.recognize(photo, echo=echo, log_on=log_on, trace=trace)
+
+
 def processing(photo, echo=True, log_on=False):
     """
     основна функція розпізнавання номеру
+
+    Повертає:
+    (str, bool): номер, чи розпізнано
     """
-    # car_photo = os.path.join(current_dir, PHOTO_FOLDER, photo)
-    # car_photo_imread = cv2.imread(photo)
-    nparr = np.frombuffer(photo, np.uint8)
-    car_photo_imread  = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-    plate_rect = []
-    if log_on:
-        print(f"{GRAY}{photo = }{RESET}")
-
-    try:
-        output_img, plate, plate_rect = detect_plate(car_photo_imread)
-        license_plate_symbols = segment_characters(plate, echo=False)
-        plate_number_ = prediction_number(license_plate_symbols)
-        print(plate_number_)
-    except UnboundLocalError:
-        output_img = car_photo_imread
-        plate_number_ = "NOT RECOGNIZED"
-
-    if plate_number_ == "NOT RECOGNIZED":
-        plate_number_ = extract_license_plate_text(car_photo_imread) # ocr
+    plate_number_, recognized, _ = processing_with_confidence(photo, echo=echo, log_on=log_on)
+    return plate_number_, recognized
+
+
+def processing_batch(photos, log_on=False):
+    """
+    Розпізнавання номерів на кількох фото (розпізнавач за замовчуванням).
+    Див. PlateRecognizer.recognize_batch.
+    """
+    return recognizer.recognize_batch(photos, log_on=log_on)
+
+
+def load_cascade_params(path):
+    """
+    Параметри каскаду, підібрані scripts/tune_cascade.py (JSON).
+
+    Повертає:
+    dict: аргументи для PlateRecognizer.configure; порожній, якщо файлу немає
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        tuned = json.load(f)
+    return {key: tuned[key] for key in CASCADE_PARAMS if key in tuned}
+
+
+def reading_confidence(probabilities):
+    """впевненість номера - найменша ймовірність серед його символів"""
+    if probabilities is not None and len(probabilities):
+        return float(probabilities.min())
+    return 0.0
+
+
+def span(trace, stage):
+    """етап розпізнавання у trace (RecognitionTrace) або нічого, якщо trace не передано"""
+    return nullcontext() if trace is None else trace.span(stage)
+
+
+class PlateRecognizer:
+    """
+    Розпізнавач номерних знаків: власні моделі, буфери та налаштування.
+
+    Моделі завантажуються при першому зверненні (або заздалегідь через
+    warm_up, наприклад у lifespan застосунку), тож імпорт модуля не тягне за
+    собою TensorFlow та PaddleOCR. Класифікатор виконується бекендом backend
+    ("keras", "onnx", "tflite"), каскад - з параметрами scale_factor та
+    min_neighbors на кадрі, зменшеному не більше ніж до detect_min_side.
+
+    Один екземпляр можна ділити між потоками: каскад OpenCV та буфер
+    підготовки символів у кожного потоку свої, бекенди класифікатора
+    потокобезпечні, а виклики PaddleOCR серіалізуються. Кілька екземплярів
+    з різними моделями можуть працювати поруч (наприклад, для A/B порівняння).
+    """
+
+    def __init__(
+        self,
+        cascade_path,
+        model_path=None,
+        backend="keras",
+        scale_factor=CASCADE_SCALE_FACTOR,
+        min_neighbors=CASCADE_MIN_NEIGHBORS,
+        detect_min_side=DETECT_MIN_SIDE,
+    ):
+        self.cascade_path = cascade_path
+        self.model_path = model_path
+        self.backend = backend
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.detect_min_side = detect_min_side
+        self._lock = threading.Lock()
+        self._ocr_lock = threading.Lock()
+        self._local = threading.local()
+        self._model = None
+        self._ocr = None
+
+    @property
+    def cascade(self):
+        # CascadeClassifier не потокобезпечний - у кожного потоку свій
+        cascade = getattr(self._local, "cascade", None)
+        if cascade is None:
+            cascade = self._local.cascade = cv2.CascadeClassifier(self.cascade_path)
+        return cascade
+
+    @property
+    def character_batch(self):
+        # буфер підготовки символів повертає view - у кожного потоку свій
+        batch = getattr(self._local, "character_batch", None)
+        if batch is None:
+            batch = self._local.character_batch = CharacterBatch()
+        return batch
+
+    def configure(
+        self,
+        backend=None,
+        model_path=None,
+        scale_factor=None,
+        min_neighbors=None,
+        detect_min_side=None,
+    ):
+        """
+        Зміна бекенду класифікатора та параметрів каскаду.
+        Модель перезавантажується лише якщо змінився бекенд або шлях до неї.
+        """
+        with self._lock:
+            if scale_factor is not None:
+                self.scale_factor = scale_factor
+            if min_neighbors is not None:
+                self.min_neighbors = min_neighbors
+            if detect_min_side is not None:
+                self.detect_min_side = detect_min_side
+            if backend is not None and (backend, model_path) != (
+                self.backend,
+                self.model_path,
+            ):
+                self.backend = backend
+                self.model_path = model_path
+                self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    model_path = self.model_path or os.path.join(
+                        current_dir, MODEL_PATHS.get(self.backend, "")
+                    )
+                    self._model = load_backend(self.backend, model_path)
+        return self._model
+
+    @property
+    def ocr(self):
+        if self._ocr is None:
+            with self._lock:
+                if self._ocr is None:
+                    from paddleocr import PaddleOCR
+
+                    # Initialize PaddleOCR with English language model
+                    self._ocr = PaddleOCR(
+                        use_angle_cls=True,
+                        lang="en",
+                        use_gpu=True,
+                        total_process_num=os.cpu_count() * 2 - 1,
+                        show_log=False,
+                    )
+        return self._ocr
+
+    def warm_up(self):
+        """завантажує всі моделі заздалегідь"""
+        return self.cascade, self.model, self.ocr
+
+    def detection_input(self, photo, shape=None):
+        """
+        зменшений сірий кадр для каскаду: (кадр, масштаб), див. decode_for_detection;
+        shape - розмір уже декодованого повного кадру
+        """
+        return decode_for_detection(photo, self.detect_min_side, shape)
+
+    def detect_plate_rects(self, img_, detection=None):
+        """
+        Виявлення номерних знаків каскадом.
+
+        Якщо передано detection = (сірий кадр, масштаб), каскад працює на
+        зменшеному кадрі, а координати переносяться на повне зображення img_.
+
+        Повертає:
+        numpy.ndarray: прямокутники (x, y, w, h) у координатах img_.
+        """
+        if detection is None:
+            return self.cascade.detectMultiScale(
+                img_, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors
+            )
+
+        gray, scale = detection
+        plate_rect = self.cascade.detectMultiScale(
+            gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors
+        )
+        if len(plate_rect) == 0 or scale == 1:
+            return plate_rect
+
+        plate_rect = plate_rect * scale
+        if img_ is not None:
+            img_h, img_w = img_.shape[:2]
+            plate_rect[:, 2] = np.minimum(plate_rect[:, 2], img_w - plate_rect[:, 0])
+            plate_rect[:, 3] = np.minimum(plate_rect[:, 3], img_h - plate_rect[:, 1])
+        return plate_rect
+
+    def find_plate_rect(self, img_, detection=None):
+        """
+        Лише виявлення номерного знака каскадом, без копій зображення та малювання.
+
+        Повертає:
+        tuple (x, y, w, h) останнього знайденого номерного знака або None.
+        """
+        plate_rect = self.detect_plate_rects(img_, detection)
+        if len(plate_rect) == 0:
+            return None
+        return tuple(int(v) for v in plate_rect[-1])
+
+    def detect_plate(self, img_, text="", detection=None, draw=True):
+        """
+        Функція призначена для виявлення та обробки номерних знаків на зображенні.
+
+        Параметри:
+        img (numpy.array): Зображення, на якому потрібно виявити та обробити номерні знаки.
+        text (str, optional): Текст, який можна додати на зображення навколо номерного знаку.
+        detection (tuple, optional): (зменшений сірий кадр, масштаб) з decode_for_detection -
+            каскад працює на ньому, а прямокутник переноситься на повне зображення.
+        draw (bool): Малювати межі номера на копії зображення. Без малювання
+            зображення не копіюється.
+
+        Повертає:
+        numpy.array: Зображення з виділеними номерними знаками та, за бажанням, доданим текстом.
+        numpy.array or None: Зображення області номерного знаку для подальшої обробки або None, якщо номерний знак не був виявлений.
+        """
+        # копія потрібна лише для малювання, область номера - це view повного зображення
+        plate_img = img_.copy() if draw or text != "" else img_
+        # display_image(img_)
+        # виявляє номерні знаки та повертає координати та розміри виявлених контурів номерних знаків
+        plate_rect = self.detect_plate_rects(img_, detection)
+
+        if len(plate_rect) > 0:
+            plate_rect = plate_rect[[len(plate_rect) - 1]]
+
+        # виділення частини номерного знака для розпізнавання
+        for x, y, w, h in plate_rect:
+            plate_ = img_[y : y + h, x : x + w, :]
+            # малювання прямокутника по межі номера
+            if draw:
+                draw_number_border(plate_img, plate_rect)
+
+        # Додавання тексту
+        if text != "":
+            plate_img = cv2.putText(
+                plate_img,
+                text,
+                (x - w // 2, y - h // 2),
+                cv2.FONT_HERSHEY_COMPLEX_SMALL,
+                0.5,
+                (51, 181, 155),
+                1,
+                cv2.LINE_AA,
+            )
+
+        # Повертаємо оброблене зображення з виділеними номерними знаками та область номерного знаку
+        return plate_img, plate_, plate_rect
+
+    def extract_license_plate_text(self, image_path):
+        """
+        Розпізнавання тексту номера через PaddleOCR.
+
+        Повертає:
+        (str, float): номер та впевненість OCR
+        """
+        ocr = self.ocr
+        # PaddleOCR не потокобезпечний
+        with self._ocr_lock:
+            # OCR debug - сірим кольором
+            print("\033[90m", end="")
+            result = ocr.ocr(image_path)
+            print("\033[0m", end="")
+
+        return processing_number_text(result)
+
+    def ocr_fallback(self, car_photo_imread, plate_rect):
+        """
+        OCR-резерв: спочатку лише область номерного знака (якщо каскад її знайшов),
+        зменшений повний кадр - в останню чергу.
+
+        Повертає:
+        (str, float): номер та впевненість OCR
+        """
+        if len(plate_rect) > 0:
+            reading = self.ocr_plate(plate_roi_for_ocr(car_photo_imread, plate_rect))
+            if reading is not None:
+                return reading
+        return self.ocr_frame(car_photo_imread)
+
+    def ocr_plate(self, roi):
+        """
+        OCR області номерного знака (plate_roi_for_ocr).
+
+        Повертає:
+        (str, float) або None, якщо номер не пройшов перевірку формату
+        """
+        plate_number_, score = self.extract_license_plate_text(roi)
+        print(f' OCR (plate) - {plate_number_}')
+        if validate_ukraine_plate(normalize_number(plate_number_)):
+            return plate_number_, score
+        return None
+
+    def ocr_frame(self, car_photo_imread):
+        """OCR зменшеного повного кадру: (номер, впевненість)"""
+        plate_number_, score = self.extract_license_plate_text(
+            downscale_for_ocr(car_photo_imread)
+        )
         print(f' OCR - {plate_number_}')
+        return plate_number_, score
+
+    def prepare_characters(self, char):
+        """
+        Підготовка зображень символів для моделі: (N, 28, 28, 3) float32.
+        Всі символи обробляються одразу у попередньо виділеному буфері потоку
+        (результат - view буфера, дійсний до наступного виклику в цьому потоці).
+        """
+        return self.character_batch.model_input(np.asarray(char))
+
+    def classify_numbers(self, chars_list):
+        """
+        Розпізнавання символів одразу для кількох номерних знаків.
+        Символи всіх номерів класифікуються одним пакетом за один прохід моделі.
+        Параметри:
+        chars_list (list): Список наборів зображень символів (по одному на номер).
+        Повертає:
+        list[tuple[str, numpy.ndarray]]: Розпізнані номери та ймовірність
+        кожного символу у тому ж порядку.
+        """
+        counts = [len(char) for char in chars_list]
+        if sum(counts) == 0:
+            return [("", np.zeros(0, dtype=np.float32)) for _ in chars_list]
+
+        # підготовка всіх символів для моделі одним тензором
+        batch = self.prepare_characters(np.concatenate([char for char in chars_list if len(char)]))
+
+        # отримуємо ймовірності для кожного класу по всіх символах одразу
+        y_proba = self.model.predict(batch)
+
+        # вибираємо клас з найвищою ймовірністю для кожного символу
+        y_ = np.argmax(y_proba, axis=1)
+        characters = CHARACTERS_ARRAY[y_]
+        probabilities = y_proba[np.arange(len(y_)), y_]
+
+        # розбиваємо символи назад по номерах
+        bounds = np.cumsum(counts)[:-1]
+        return [
+            ("".join(part), proba)
+            for part, proba in zip(np.split(characters, bounds), np.split(probabilities, bounds))
+        ]
+
+    def detect_and_segment(self, car_photo_imread, detection=None, trace=None):
+        """
+        Виявлення номерного знака та виділення символів.
+
+        Повертає:
+        (output_img, plate_rect, license_plate_symbols) - symbols is None, якщо номер не знайдено
+        """
+        try:
+            with span(trace, "cascade"):
+                output_img, plate, plate_rect = self.detect_plate(
+                    car_photo_imread, detection=detection, draw=False
+                )
+            with span(trace, "segment"):
+                license_plate_symbols = segment_characters(plate, echo=False)
+        except UnboundLocalError:
+            return car_photo_imread, [], None
+        return output_img, plate_rect, license_plate_symbols
+
+    def finish_recognition(
+        self,
+        plate_number_,
+        probabilities,
+        car_photo_imread,
+        output_img,
+        plate_rect,
+        echo=True,
+        log_on=False,
+        trace=None,
+    ):
+        """
+        OCR-резерв, корекція та перевірка розпізнаного номера.
+
+        Якщо кожен символ розпізнано моделлю з ймовірністю не нижче
+        CHAR_CONFIDENCE_THRESHOLD і номер проходить перевірку формату - OCR не
+        запускається. Інакше номер уточнюється через OCR.
+
+        Повертає:
+        (str, bool, float): номер, чи розпізнано, впевненість
+        """
+        confidence = reading_confidence(probabilities)
+
+        if needs_ocr(plate_number_, confidence, CHAR_CONFIDENCE_THRESHOLD):
+            with span(trace, "ocr"):
+                ocr_number, ocr_confidence = self.ocr_fallback(car_photo_imread, plate_rect)
+            if trace is not None:
+                trace.fallback = True
+            plate_number_, confidence = choose_reading(
+                plate_number_, confidence, ocr_number, ocr_confidence
+            )
 
-    plate_number_before_ua = plate_number_
-    if len(plate_number_) == 8:
-        plate_number_ = correction_ua_number(plate_number_)
+        plate_number_before_ua = plate_number_
+        plate_number_ = normalize_number(plate_number_)
         if log_on and plate_number_ != plate_number_before_ua:
             print(CYAN, TAB, plate_number_, "<<< corrected by ua_nm", RESET)
 
-    if not validate_ukraine_plate(plate_number_):
-        recognized = False
-        if len(plate_rect) > 0:
-            draw_number_border(output_img, plate_rect, color_=RED)
-    else:
-        recognized = True
+        recognized = validate_ukraine_plate(plate_number_)
 
-    if echo:
-        img_result = make_final_image(
-            output_img, recognized_text=plate_number_, recognized=recognized
+        if echo:
+            output_img = output_img.copy()
+            draw_number_border(output_img, plate_rect, color_="" if recognized else RED)
+            img_result = make_final_image(
+                output_img, recognized_text=plate_number_, recognized=recognized
+            )
+            display_image(
+                img_result,
+                title="Номерний знак" + (" НЕ" if not recognized else "") + " розпізнано",
+                recognized=recognized,
+            )
+        if trace is not None:
+            trace.confidence = round(confidence, 4)
+        return plate_number_, recognized, round(confidence, 4)
+
+    def recognize(self, photo, echo=True, log_on=False, trace=None):
+        """
+        Розпізнавання номера на фото.
+
+        :param trace: RecognitionTrace: якщо передано - туди записуються
+            тривалість етапів, чи спрацював OCR-резерв і впевненість
+
+        Повертає:
+        (str, bool, float): номер, чи розпізнано, впевненість
+        """
+        with span(trace, "decode"):
+            car_photo_imread = decode_photo(photo)
+            detection = self.detection_input(photo, getattr(car_photo_imread, "shape", None))
+
+        if log_on:
+            print(f"{GRAY}{photo = }{RESET}")
+
+        output_img, plate_rect, license_plate_symbols = self.detect_and_segment(
+            car_photo_imread, detection, trace
         )
-        display_image(
-            img_result,
-            title="Номерний знак" + (" НЕ" if not recognized else "") + " розпізнано",
-            recognized=recognized,
+        if license_plate_symbols is None:
+            plate_number_, probabilities = NOT_RECOGNIZED, None
+        else:
+            with span(trace, "classify"):
+                plate_number_, probabilities = self.classify_numbers(
+                    [license_plate_symbols]
+                )[0]
+            print(plate_number_)
+
+        return self.finish_recognition(
+            plate_number_,
+            probabilities,
+            car_photo_imread,
+            output_img,
+            plate_rect,
+            echo=echo,
+            log_on=log_on,
+            trace=trace,
         )
-    return plate_number_, recognized
 
+    # покрокове розпізнавання (RecognitionExecutor): кожен етап - окреме
+    # завдання, між етапами запит можна скасувати
+
+    def detect_stage(self, photo, trace=None):
+        """
+        Етап виявлення: декодування, каскад та виділення символів.
+
+        Повертає:
+        (plate_rect, symbols) - symbols is None, якщо символи не виділено;
+        plate_rect порожній, якщо каскад номер не знайшов. None, якщо фото
+        не вдалося декодувати. Область номера для OCR тут не готується -
+        її будує ocr_stage, лише коли OCR-резерв справді потрібен.
+        """
+        with span(trace, "decode"):
+            car_photo_imread = decode_photo(photo)
+            if car_photo_imread is None:
+                return None
+            detection = self.detection_input(photo, car_photo_imread.shape)
+
+        _, plate_rect, symbols = self.detect_and_segment(car_photo_imread, detection, trace)
+        return plate_rect, symbols
+
+    def classify_stage(self, symbols, trace=None):
+        """Етап класифікації символів одного номера: (номер, впевненість)"""
+        with span(trace, "classify"):
+            plate_number_, probabilities = self.classify_numbers([symbols])[0]
+        return plate_number_, reading_confidence(probabilities)
+
+    def ocr_stage(self, photo, plate_rect, trace=None):
+        """
+        Етап OCR-резерву: кадр декодується заново, спочатку OCR області
+        номера (plate_rect з етапу виявлення), повний кадр - лише якщо OCR
+        області не дав номера правильного формату.
+
+        Повертає:
+        (str, float): номер та впевненість OCR
+        """
+        with span(trace, "ocr"):
+            return self.ocr_fallback(decode_photo(photo), plate_rect)
+
+    def recognize_batch(self, photos, log_on=False):
+        """
+        Розпізнавання номерів на кількох фото.
+        Виявлення номерів виконується для кожного фото, а класифікація символів
+        усіх номерів - одним пакетом за один прохід моделі.
+
+        Повертає:
+        list[tuple[str, bool, float]]: (номер, чи розпізнано, впевненість)
+        для кожного фото у тому ж порядку
+        """
+        decoded = [decode_photo(photo) for photo in photos]
+        stages = [
+            self.detect_and_segment(img, self.detection_input(photo, img.shape))
+            if img is not None
+            else None
+            for img, photo in zip(decoded, photos)
+        ]
+
+        chars_list = [stage[2] for stage in stages if stage is not None and stage[2] is not None]
+        numbers = iter(self.classify_numbers(chars_list)) if chars_list else iter(())
+
+        results = []
+        for img, stage in zip(decoded, stages):
+            if stage is None:
+                results.append((NOT_RECOGNIZED, False, 0.0))
+                continue
+            output_img, plate_rect, license_plate_symbols = stage
+            if license_plate_symbols is None:
+                plate_number_, probabilities = NOT_RECOGNIZED, None
+            else:
+                plate_number_, probabilities = next(numbers)
+            results.append(
+                self.finish_recognition(
+                    plate_number_,
+                    probabilities,
+                    img,
+                    output_img,
+                    plate_rect,
+                    echo=False,
+                    log_on=log_on,
+                )
+            )
+        return results
 
-# loading the data required for detecting the license plates using cascade classifier.
-current_dir = os.getcwd()
-
-plate_cascade_path = os.path.join(current_dir, MODEL_CASCADE)
-plate_cascade = cv2.CascadeClassifier(plate_cascade_path)
 
-model_keras = os.path.join(current_dir, MODEL_KERAS)
-model = load_model(model_keras, compile=False)
+# моделі для виявлення номерних знаків та розпізнавання символів - завантажуються ледаче
+current_dir = os.getcwd()
 
-tmp_file = os.path.join(current_dir, TMP)
+# розпізнавач за замовчуванням для функцій модуля
+recognizer = PlateRecognizer(cascade_path=os.path.join(current_dir, MODEL_CASCADE))
 
 if __name__ == "__main__":
 
@@ -0,0 +1,86 @@
+"""
+Бекенди onnx та tflite повинні передбачати ті самі символи, що й Keras,
+на символах номерів з DS/images.
+Тест пропускається, якщо немає моделі чи середовища виконання бекенду
+(моделі onnx/tflite створює scripts/export_model.py).
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.services.inference import MODEL_PATHS, InferenceBackend, load_backend
+
+ROOT = Path(__file__).resolve().parents[1]
+IMAGES_DIR = ROOT / "DS/images"
+RUNTIMES = {"keras": "keras", "onnx": "onnxruntime", "tflite": "tensorflow"}
+ATOL = 1e-4
+
+
+def backend(name: str) -> InferenceBackend:
+    path = ROOT / MODEL_PATHS[name]
+    if not path.exists():
+        pytest.skip(f"{MODEL_PATHS[name]} not found")
+    if name == "tflite":
+        try:
+            import tflite_runtime  # noqa: F401
+        except ImportError:
+            pytest.importorskip("tensorflow")
+    else:
+        pytest.importorskip(RUNTIMES[name])
+    return load_backend(name, str(path))
+
+
+@pytest.fixture(scope="module")
+def characters() -> dict[str, np.ndarray]:
+    """
+    Символи номерів з DS/images, знайдені каскадом і вирізані
+    segment_characters/prepare_characters, як у benchmarks/bench_inference.py.
+    """
+    import cv2
+
+    if not hasattr(cv2, "CascadeClassifier"):
+        pytest.skip("cv2 without CascadeClassifier")
+    from src.services import use_model
+
+    batches = {}
+    cwd = os.getcwd()
+    os.chdir(ROOT)  # шлях до каскаду в use_model відносний до кореня проєкту
+    try:
+        for path in sorted(IMAGES_DIR.glob("*.jpg")):
+            img = cv2.imread(str(path))
+            try:
+                _, plate, _ = use_model.detect_plate(img, draw=False)
+            except UnboundLocalError:
+                continue
+            chars = use_model.segment_characters(plate, echo=False)
+            if len(chars):
+                batches[path.stem] = use_model.prepare_characters(chars).copy()
+    finally:
+        os.chdir(cwd)
+    if not batches:
+        pytest.skip("no plate characters found in DS/images")
+    return batches
+
+
+@pytest.fixture(scope="module")
+def keras_proba(characters):
+    keras = backend("keras")
+    return {stem: keras.predict(batch) for stem, batch in characters.items()}
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        InferenceBackend("model")
+
+
+@pytest.mark.parametrize("name", ["onnx", "tflite"])
+def test_backend_matches_keras(name, characters, keras_proba):
+    model = backend(name)
+    for stem, batch in characters.items():
+        proba, expected = model.predict(batch), keras_proba[stem]
+
+        assert proba.shape == expected.shape, stem
+        np.testing.assert_array_equal(proba.argmax(axis=1), expected.argmax(axis=1), stem)
+        np.testing.assert_allclose(proba, expected, atol=ATOL, err_msg=stem)
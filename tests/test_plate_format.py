@@ -0,0 +1,249 @@
+"""
+Нормалізація номерів: plate_format проти попередньої реалізації (ланцюжки
+.replace() та re.match з рядковими шаблонами).
+
+Фаззинг перевіряє, що correction_ua_number, validate_ukraine_plate та
+processing_number_text (включно з надрукованим текстом) дають той самий
+результат, що й попередня реалізація, для всього, крім номерів зразка
+1995 року (12345AB) - їх раніше не розпізнавали, вони перевіряються окремо.
+"""
+import contextlib
+import io
+import random
+import re
+
+import pytest
+
+from src.conf.constants import NOT_NUMBER
+from src.services import plate_format
+from src.services.use_model import processing_number_text
+
+# символи, які зачіпає корекція, плюс трохи "шуму" (пробіли, переноси,
+# малі літери, кирилиця та не-ASCII цифри)
+ALPHABET = (
+    "ABCEHIKMOPTXZBJGYS" "0123456789" "0123456789" "1i|0785" "IOJGAZBYS" "aikx" " \n\t"
+    "АВСЕНІКМОРТХ" "٣۵"
+)
+
+
+def old_correction_ua_number(text: str) -> str:
+    text_list = list(text)
+
+    for i in [0, 1, 6, 7]:
+        text_list[i] = (
+            text_list[i]
+            .replace("1", "I")
+            .replace("i", "I")
+            .replace("|", "I")
+            .replace("0", "O")
+            .replace("7", "Z")
+            .replace("8", "B")
+            .replace("5", "B")
+        )
+
+    for i in [2, 3, 4, 5]:
+        text_list[i] = (
+            text_list[i]
+            .replace("I", "1")
+            .replace("|", "1")
+            .replace("O", "0")
+            .replace("J", "3")
+            .replace("G", "6")
+            .replace("A", "6")
+            .replace("Z", "7")
+            .replace("B", "8")
+            .replace("Y", "9")
+            .replace("S", "9")
+        )
+
+    text = "".join(text_list)
+    return text
+
+
+def old_validate_ukraine_plate(text):
+    pattern = r"^[A-Z]{2}\d{4}[A-Z]{2}$"
+    return bool(re.match(pattern, text))
+
+
+def old_processing_number_text(result):
+    """
+    Вибір номера з результату PaddleOCR (попередня реалізація).
+
+    Повертає:
+    (str, float): номер та впевненість OCR для нього
+    """
+    text_up = ""
+    score_up = 0.0
+    output_text = ""
+    output_score = 0.0
+
+    for line in result:
+        if not line:  # PaddleOCR повертає [None], якщо тексту не знайдено
+            continue
+
+        for word in line:
+
+            text_pred = word[1][0].strip().replace("\n", "").replace(" ", "")
+            score = float(word[1][1])
+            if len(text_pred) == 8:
+                text_pred = old_correction_ua_number(text_pred)
+
+            if text_pred in NOT_NUMBER:
+                continue
+
+            # для американських номерів (в 2 ряди)
+            if re.match(r"^[A-Z0-9]{4}$", text_pred) and text_up == "":
+                text_up = text_pred
+                score_up = score
+                print(f"->> {text_up = }")
+                text_up_list = list(text_up)
+                for i in range(len(text_up_list)):
+                    text_up_list[i] = (
+                        text_up_list[i]
+                        .replace("1", "I")
+                        .replace("i", "I")
+                        .replace("|", "I")
+                        .replace("0", "O")
+                        .replace("7", "Z")
+                        .replace("8", "B")
+                        .replace("5", "B")
+                    )
+                text_up = "".join(text_up_list)
+                print(f"+>> {text_up = }")
+
+            elif re.match(r"^\d{4}$", text_pred) and re.match(r"^[A-Z]{4}$", text_up):
+                text_pred = text_up[:2] + text_pred + text_up[2:]
+                score = min(score, score_up)
+                text_up = ""
+
+            output_text = text_pred
+            output_score = score
+            # print(f">-> {output_text = }")
+
+            if re.match(r"^[A-Z0-9]+$", output_text):
+                if old_validate_ukraine_plate(output_text):
+                    print(f"Detected License Plate: \033[33m{output_text}\033[0m")
+                else:
+                    print(f"-Invalid License Plate: \033[31m{output_text}\033[0m")
+                    # print(f">-- {output_text = }")
+        # print(f"--> {output_text = }")
+    return output_text, output_score
+
+
+
+def random_text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def random_plate(rng: random.Random) -> str:
+    """майже правильний номер: AA1234BB з типовими помилками OCR"""
+    text = (
+        "".join(rng.choice("ABCEHIKMOPTX10875") for _ in range(2))
+        + "".join(rng.choice("0123456789IOJGAZBYS") for _ in range(4))
+        + "".join(rng.choice("ABCEHIKMOPTX10875") for _ in range(2))
+    )
+    if rng.random() < 0.1:
+        text += rng.choice(["\n", " ", "\n "])
+    return text
+
+
+def random_token(rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.3:
+        return random_plate(rng)
+    if kind < 0.45:
+        return "".join(rng.choice("ABCEHIKMOPTX10875i|") for _ in range(4))  # верхній рядок
+    if kind < 0.6:
+        return "".join(rng.choice("0123456789") for _ in range(4))  # нижній рядок
+    if kind < 0.7:
+        return rng.choice(NOT_NUMBER)
+    return random_text(rng, rng.randint(0, 12))
+
+
+def random_ocr_result(rng: random.Random) -> list:
+    """результат PaddleOCR: рядки зі словами [box, (текст, впевненість)] або [None]"""
+    if rng.random() < 0.05:
+        return [None]
+    return [
+        [[None, (random_token(rng), rng.random())] for _ in range(rng.randint(1, 4))]
+        for _ in range(rng.randint(1, 2))
+    ]
+
+
+def captured(func, *args):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = func(*args)
+    return result, output.getvalue()
+
+
+CASES = 20000
+
+
+def is_ua_1995(token: str) -> bool:
+    """токен, який тепер приймається за шаблоном UA_1995"""
+    return plate_format.UA_1995.validate(plate_format.clean_token(token))
+
+
+def tokens(result) -> list[str]:
+    return [word[1][0] for line in result if line for word in line]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_correction_and_validation_match_previous(seed):
+    rng = random.Random(seed)
+    texts = [
+        random_plate(rng) if i % 2 else random_text(rng, rng.randint(6, 10))
+        for i in range(CASES)
+    ]
+    for text in texts:
+        if len(text) == 8:
+            assert old_correction_ua_number(text) == plate_format.correction_ua_number(text)
+            assert old_correction_ua_number(text) == plate_format.normalize_number(text)
+        if not plate_format.UA_1995.validate(text):
+            assert old_validate_ukraine_plate(text) == plate_format.validate_ukraine_plate(text)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_processing_number_text_matches_previous(seed):
+    rng = random.Random(seed)
+    results = [random_ocr_result(rng) for _ in range(CASES // 10)]
+    for result in results:
+        if any(is_ua_1995(token) for token in tokens(result)):
+            continue
+        assert captured(old_processing_number_text, result) == captured(
+            processing_number_text, result
+        ), result
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("12345AB", "12345AB"),
+        ("AA1234BB", "AA1234BB"),
+        ("AAI234B8", "AA1234BB"),
+    ],
+)
+def test_normalize_number_templates(text, expected):
+    assert plate_format.normalize_number(text) == expected
+    assert plate_format.validate_ukraine_plate(expected)
+
+
+@pytest.mark.parametrize("text", ["A1234BB", "I2345AB", "1234SOB"])
+def test_ua_1995_is_not_corrected(text):
+    """сучасний номер з пропущеною літерою не стає номером зразка 1995 року"""
+    assert plate_format.normalize_number(text) == text
+    assert not plate_format.validate_ukraine_plate(text)
+    assert plate_format.needs_ocr(text, 0.99, 0.5)
+
+
+def test_processing_number_text_ua_1995():
+    result = [[[None, ("12345AB", 0.9)]]]
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert processing_number_text(result) == ("12345AB", 0.9)
+
+
+def test_find_template():
+    assert plate_format.find_template("AA1234BB") is plate_format.UA
+    assert plate_format.find_template("12345AB") is plate_format.UA_1995
+    assert plate_format.find_template("1234ABC") is None